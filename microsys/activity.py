@@ -0,0 +1,238 @@
+"""
+Activity log writing helpers.
+
+Signal receivers hand their rows to `write_activity_log`, which either
+INSERTs immediately (default) or queues them in a buffer that is flushed
+with a single `bulk_create`. Buffers live in a context variable, so each
+request (sync or async), task or thread gets its own.
+
+Buffering is opt-in through `MICROSYS_CONFIG['activity_log']`:
+
+    MICROSYS_CONFIG = {
+        'activity_log': {
+            'buffered': True,       # Queue rows instead of one INSERT per save
+            'buffer_size': 100,     # Flush when this many rows are queued
+            'flush_interval': 5,    # Flush when the oldest queued row is this old (seconds)
+        },
+    }
+
+The middleware flushes at the end of every request. Outside of requests
+(management commands, shells, workers) the buffer is flushed when a threshold
+is hit, when a `buffered_activity_log()` block exits, and at interpreter exit.
+
+Bulk operations can be summarized instead of logged row by row: inside a
+`bulk_activity_log()` block (or for every ScopedQuerySet bulk call when
+`'bulk_summary': True` is set) all rows touched per model and action are
+collapsed into a single log entry holding the row count and an id list/range.
+"""
+import atexit
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.conf import settings
+
+_activity_state = ContextVar('microsys_activity_state', default=None)
+
+DEFAULT_BUFFER_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5
+# Bulk summaries list the ids up to this many rows, and a first-last range beyond it
+BULK_ID_LIST_LIMIT = 10
+
+
+def get_activity_log_config():
+    """Return the `activity_log` section of MICROSYS_CONFIG (empty dict if unset)."""
+    ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+    return ms_config.get('activity_log', None) or {}
+
+
+def _new_state():
+    return SimpleNamespace(rows=[], started=None, forced=0, bulk=None)
+
+
+def _state():
+    """Return the activity log state of the current context, creating it on first use."""
+    state = _activity_state.get()
+    if state is None:
+        state = _new_state()
+        _activity_state.set(state)
+    return state
+
+
+def bind_activity_state():
+    """Give the current request a fresh activity log state. Returns a token for reset."""
+    return _activity_state.set(_new_state())
+
+
+def reset_activity_state(token):
+    """Restore the state that was active before bind_activity_state()."""
+    _activity_state.reset(token)
+
+
+def _buffering_enabled(state):
+    return state.forced > 0 or bool(get_activity_log_config().get('buffered', False))
+
+
+def write_activity_log(**fields):
+    """
+    Record a UserActivityLog row.
+    Creates it right away unless buffering is enabled, in which case the row
+    is queued and written on the next flush.
+    """
+    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
+
+    state = _state()
+    if not _buffering_enabled(state):
+        return UserActivityLog.objects.create(**fields)
+
+    buffer = state.rows
+    if not buffer:
+        state.started = time.monotonic()
+    buffer.append(UserActivityLog(**fields))
+
+    config = get_activity_log_config()
+    max_size = config.get('buffer_size', DEFAULT_BUFFER_SIZE)
+    max_age = config.get('flush_interval', DEFAULT_FLUSH_INTERVAL)
+    age = time.monotonic() - (state.started or 0)
+    if len(buffer) >= max_size or (max_age is not None and age >= max_age):
+        flush_activity_log()
+    return None
+
+
+def flush_activity_log():
+    """Write all queued rows of the current context with one bulk_create."""
+    state = _state()
+    if not state.rows:
+        return 0
+
+    rows = list(state.rows)
+    state.rows.clear()
+    state.started = None
+
+    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
+    UserActivityLog.objects.bulk_create(rows)
+    return len(rows)
+
+
+@contextmanager
+def buffered_activity_log():
+    """
+    Buffer activity log rows for the duration of the block, regardless of the
+    `buffered` setting, and flush them when the block exits.
+
+    Usage:
+        with buffered_activity_log():
+            for row in rows:
+                MyModel.objects.create(**row)
+    """
+    state = _state()
+    state.forced += 1
+    try:
+        yield
+    finally:
+        state.forced -= 1
+        if not state.forced:
+            flush_activity_log()
+
+
+def bulk_summary_enabled():
+    """True inside a bulk_activity_log() block or when 'bulk_summary' is configured."""
+    if _state().bulk is not None:
+        return True
+    return bool(get_activity_log_config().get('bulk_summary', False))
+
+
+def collect_bulk_rows(model, action, pks):
+    """
+    Add rows to the active bulk summary instead of logging them one by one.
+    Only compact stats are kept (count, first/last id and a short id list).
+    Returns False if no bulk_activity_log() block is active.
+    """
+    groups = _state().bulk
+    if groups is None:
+        return False
+
+    stats = groups.setdefault((model, action), {'count': 0, 'first': None, 'last': None, 'ids': []})
+    for pk in pks:
+        stats['count'] += 1
+        if pk is None:
+            continue
+        if stats['first'] is None or pk < stats['first']:
+            stats['first'] = pk
+        if stats['last'] is None or pk > stats['last']:
+            stats['last'] = pk
+        if len(stats['ids']) <= BULK_ID_LIST_LIMIT:
+            stats['ids'].append(pk)
+    return True
+
+
+def collect_bulk_stats(model, action, count, first, last, ids):
+    """
+    Like collect_bulk_rows, for callers that computed the stats themselves
+    (e.g. with one aggregate query). `ids` needs at most BULK_ID_LIST_LIMIT + 1 pks.
+    Returns False if no bulk_activity_log() block is active.
+    """
+    groups = _state().bulk
+    if groups is None:
+        return False
+
+    stats = groups.setdefault((model, action), {'count': 0, 'first': None, 'last': None, 'ids': []})
+    stats['count'] += count
+    if first is not None and (stats['first'] is None or first < stats['first']):
+        stats['first'] = first
+    if last is not None and (stats['last'] is None or last > stats['last']):
+        stats['last'] = last
+    stats['ids'].extend(ids[:BULK_ID_LIST_LIMIT + 1 - len(stats['ids'])])
+    return True
+
+
+def format_bulk_ids(stats):
+    """Render bulk stats as '3: 4, 7, 9' or '120: 5-130' (fits UserActivityLog.number)."""
+    count = stats['count']
+    if count <= BULK_ID_LIST_LIMIT and len(stats['ids']) == count:
+        ids = ", ".join(str(pk) for pk in sorted(stats['ids']))
+    elif stats['first'] is not None:
+        ids = f"{stats['first']}-{stats['last']}"
+    else:
+        ids = ""
+    return f"{count}: {ids}".strip()[:50]
+
+
+@contextmanager
+def bulk_activity_log():
+    """
+    Collapse the activity logs produced inside the block into one summary
+    entry per model and action, written when the block exits successfully.
+
+    Usage:
+        with bulk_activity_log():
+            Document.objects.filter(year=2020).delete()
+    """
+    state = _state()
+    if state.bulk is not None:
+        # Nested block: the outermost one writes the summaries
+        yield
+        return
+
+    groups = state.bulk = {}
+    try:
+        yield
+    finally:
+        state.bulk = None
+
+    if groups:
+        from .signals import log_bulk_summaries
+        log_bulk_summaries(groups)
+
+
+def _flush_at_exit():
+    try:
+        flush_activity_log()
+    except Exception:
+        # The database may already be gone at interpreter shutdown
+        pass
+
+
+atexit.register(_flush_at_exit)
@@ -64,6 +64,13 @@ class MicrosysConfig(AppConfig):
         import microsys.signals
         import microsys.discovery
 
+        # Track loaded soft-delete state so saves don't need a pre_save SELECT
+        for model in apps.get_models():
+            microsys.signals.track_soft_delete_state(model)
+
+        # Compile per-model logging policies once so receivers do a single dict lookup
+        microsys.signals.build_logging_policies()
+
     def _validate_configuration(self):
         """Validate microsys configuration at startup and emit warnings."""
         import warnings
@@ -1,20 +1,71 @@
-from .utils import is_scope_enabled
+from .utils import is_scope_enabled, get_cache_generation, bump_cache_generation, LazyContextValue
 from django.conf import settings
 import hashlib
-import json
 from django.core.cache import cache
 from django.urls import reverse, NoReverseMatch
-from .discovery import discover_list_urls, get_sidebar_config
+from django.utils.functional import cached_property
+from .discovery import (
+    discover_list_urls, get_sidebar_config, get_sidebar_config_hash,
+    get_registry_fingerprint, reset_discovery_state,
+)
+
+# Every sidebar cache key embeds this counter; bumping it invalidates them all at once
+SIDEBAR_GENERATION_KEY = 'microsys_sidebar_generation'
 
 # Helper functions for Sidebar - KEPT PRIVATE
-def _get_config_hash(config):
-    """Generate a hash of the config for cache key."""
-    # Exclude EXTRA_ITEMS from hash since they're processed separately
-    config_copy = {k: v for k, v in config.items() if k != 'EXTRA_ITEMS'}
-    config_str = json.dumps(config_copy, sort_keys=True)
-    return hashlib.md5(config_str.encode()).hexdigest()[:8]
-
-def _process_extra_items(config, request):
+def _resolve_url(url_name):
+    try:
+        return reverse(url_name)
+    except NoReverseMatch:
+        return '#'
+
+def _is_active(path, url):
+    """Check if current path matches or is nested under the given URL."""
+    if url == '#':
+        return False
+    return path == url or path.startswith(url.rstrip('/') + '/')
+
+def _user_can(user, permission):
+    """Check an EXTRA_ITEMS permission (string or list/tuple/set, any match wins)."""
+    if not permission:
+        return True
+    perms = permission if isinstance(permission, (list, tuple, set)) else [permission]
+    for perm in perms:
+        if perm == 'is_staff':
+            allowed = user.is_staff
+        elif perm == 'is_superuser':
+            allowed = user.is_superuser
+        else:
+            allowed = user.has_perm(perm)
+        if allowed:
+            return True
+    return False
+
+def _permission_fingerprint(user):
+    """
+    Short hash of everything the sidebar filtering depends on, so users
+    sharing the same permission set share one cached sidebar.
+    """
+    if user.is_superuser and user.is_active:
+        # Every permission passes, but 'is_staff' items still follow the flag
+        return f'su:{user.is_staff}'
+    raw = '|'.join([
+        str(user.is_staff), str(user.is_superuser), str(user.is_active),
+        ','.join(sorted(user.get_all_permissions())),
+    ])
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+def get_sidebar_generation():
+    """Return the current sidebar cache generation."""
+    return get_cache_generation(SIDEBAR_GENERATION_KEY)
+
+def _sidebar_key_prefix(lang_code):
+    return (
+        f'microsys_sidebar:{get_sidebar_generation()}:{get_registry_fingerprint()}'
+        f':{lang_code}:{get_sidebar_config_hash(lang_code=lang_code)}'
+    )
+
+def _process_extra_items(config, user):
     """
     Process EXTRA_ITEMS config into sidebar-ready format.
     
@@ -24,186 +75,224 @@ def _process_extra_items(config, request):
     processed_groups = {}
     
     for group_name, group_config in extra_items.items():
-        group_icon = group_config.get('icon', 'bi-gear')
         items = []
-        
         for item in group_config.get('items', []):
+            if not _user_can(user, item.get('permission')):
+                continue
             url_name = item.get('url_name', '')
-            
-            # Check permission if specified (supports string or list/tuple/set)
-            permission = item.get('permission')
-            if permission:
-                perms = permission if isinstance(permission, (list, tuple, set)) else [permission]
-                allowed = False
-                for perm in perms:
-                    if perm == 'is_staff':
-                        allowed = request.user.is_staff
-                    elif perm == 'is_superuser':
-                        allowed = request.user.is_superuser
-                    else:
-                        allowed = request.user.has_perm(perm)
-                    if allowed:
-                        break
-                if not allowed:
-                    continue
-            
-            # Resolve URL
-            try:
-                url = reverse(url_name)
-                active = request.path == url or request.path.startswith(url.rstrip('/') + '/')
-            except NoReverseMatch:
-                url = '#'
-                active = False
-            
             items.append({
                 'url_name': url_name,
-                'url': url,
+                'url': _resolve_url(url_name),
                 'label': item.get('label', url_name),
                 'icon': item.get('icon', 'bi-link'),
-                'active': active,
             })
         
         if items:  # Only add group if it has visible items
             processed_groups[group_name] = {
-                'icon': group_icon,
+                'icon': group_config.get('icon', 'bi-gear'),
                 'items': items,
-                'has_active': any(item['active'] for item in items),
             }
     
     return processed_groups
 
-def microsys_context(request):
+def _resolve_sidebar(user, lang_code, config):
     """
-    Unified context processor for the entire Microsys package.
-    Combines:
-    1. Branding Configuration (APP_CONFIG)
-    2. Scope Settings
-    3. Sidebar Navigation items
-    4. Theme Settings
+    Build the permission-filtered sidebar with resolved URLs.
+    The result only depends on language, config and permission set, so it is
+    cached under a key made of those; the per-request 'active' flag is not part of it.
     """
-    context = {}
-
-    # 1. Branding / App Config
-    # Default configuration
-    default_config = {
-        'name': 'microsys',
-        'verbose_name': 'ادارة النظام',
-        'logo': '/static/img/base_logo.png',
-        'login_logo': '/static/img/login_logo.webp',
-        'favicon': '/static/favicon.ico',
-        'home_url': '/sys/',  # Default home link in titlebar
+    key_prefix = _sidebar_key_prefix(lang_code)
+    cache_key = f'{key_prefix}:{_permission_fingerprint(user)}'
+    resolved = cache.get(cache_key)
+    if resolved is not None:
+        return resolved
+
+    # Discovered items are shared by every permission set
+    items_key = f'{key_prefix}:auto_items'
+    items = cache.get(items_key)
+    if items is None:
+        items = discover_list_urls(lang_code=lang_code)
+        cache.set(items_key, items, timeout=config['CACHE_TIMEOUT'])
+
+    # Filter by user permissions (superusers see everything)
+    if not user.is_superuser:
+        items = [
+            item for item in items
+            if not item.get('permissions') or any(user.has_perm(p) for p in item['permissions'])
+        ]
+
+    resolved = {
+        'auto_items': [{**item, 'url': _resolve_url(item['url_name'])} for item in items],
+        'extra_groups': _process_extra_items(config, user),
     }
-    
-    # Get user config from settings.py
-    user_config = getattr(settings, 'MICROSYS_CONFIG', {})
-    
-    # Merge configurations
-    final_config = default_config.copy()
-    final_config.update(user_config)
-    
-    context['APP_CONFIG'] = final_config
+    cache.set(cache_key, resolved, timeout=config['CACHE_TIMEOUT'])
+    return resolved
 
+class _MicrosysContext:
+    """
+    Per-request state behind microsys_context. Every part is computed on
+    first use and shared by all renders of the same request.
+    """
+    def __init__(self, request):
+        self.request = request
 
-    # 2. Scope Settings
-    # We add this boolean so templates know if the scope feature is ON globally
-    context['scope_settings'] = {'is_enabled': is_scope_enabled()}
+    @cached_property
+    def app_config(self):
+        # 1. Branding / App Config
+        # Default configuration
+        default_config = {
+            'name': 'microsys',
+            'verbose_name': 'ادارة النظام',
+            'logo': '/static/img/base_logo.png',
+            'login_logo': '/static/img/login_logo.webp',
+            'favicon': '/static/favicon.ico',
+            'home_url': '/sys/',  # Default home link in titlebar
+        }
+        
+        # Get user config from settings.py
+        user_config = getattr(settings, 'MICROSYS_CONFIG', {})
+        
+        # Merge configurations
+        final_config = default_config.copy()
+        final_config.update(user_config)
+        return final_config
 
-    # 3. User Preferences (for JS injection & server-side logic)
-    user_prefs = {}
-    if request.user.is_authenticated and hasattr(request.user, 'profile'):
-        user_prefs = request.user.profile.preferences or {}
-    context['user_preferences'] = user_prefs # Injected for JS use
+    @cached_property
+    def scope_settings(self):
+        # 2. Scope Settings
+        # We add this boolean so templates know if the scope feature is ON globally
+        return {'is_enabled': is_scope_enabled()}
 
-    # 4. Language / i18n (resolved BEFORE sidebar so labels can be translated)
-    from .translations import get_strings
+    @cached_property
+    def user_prefs(self):
+        # 3. User Preferences (for JS injection & server-side logic)
+        user = self.request.user
+        if user.is_authenticated and hasattr(user, 'profile'):
+            return user.profile.preferences or {}
+        return {}
 
-    # Available languages from config (default: Arabic only)
-    default_languages = {
-        'ar': {'name': 'العربية', 'dir': 'rtl', 'flag': '🇱🇾'},
-    }
-    languages = final_config.get('languages', default_languages)
+    @cached_property
+    def languages(self):
+        # Available languages from config (default: Arabic only)
+        default_languages = {
+            'ar': {'name': 'العربية', 'dir': 'rtl', 'flag': '🇱🇾'},
+        }
+        return self.app_config.get('languages', default_languages)
 
-    # Resolve active language: user pref → session → config default → 'ar'
-    default_lang = final_config.get('default_language', 'ar')
-    
-    current_lang = None
-    # 1. User Preference
-    if user_prefs and 'language' in user_prefs:
-        current_lang = user_prefs.get('language')
-    
-    # 2. Session Preference (for anonymous users or overrides)
-    if not current_lang:
-        current_lang = request.session.get('lang')
+    @cached_property
+    def current_lang(self):
+        # 4. Language / i18n
+        # Resolve active language: user pref → session → config default → 'ar'
+        languages = self.languages
+        default_lang = self.app_config.get('default_language', 'ar')
+        user_prefs = self.user_prefs
         
-    # 3. Default
-    if not current_lang:
-        current_lang = default_lang
-
-    # Validate the resolved language exists in available languages
-    if current_lang not in languages:
-        current_lang = default_lang if default_lang in languages else 'ar'
-
-    lang_config = languages.get(current_lang, {'name': 'العربية', 'dir': 'rtl', 'flag': '🇱🇾'})
-    current_dir = lang_config.get('dir', 'rtl')
-
-    # Get translated strings (with project-level overrides from config)
-    project_overrides = final_config.get('translations', None)
-    ms_trans = get_strings(current_lang, overrides=project_overrides)
-
-    context['CURRENT_LANG'] = current_lang
-    context['CURRENT_DIR'] = current_dir
-    context['LANGUAGES'] = languages
-    context['LANG_CONFIG'] = lang_config
-    context['MS_TRANS'] = ms_trans
-
-    # 5. Sidebar Context (uses current_lang for translated labels)
-    config = get_sidebar_config(lang_code=current_lang)
-    # Include config hash + lang in cache key so language changes get fresh items
-    cache_key = f'sidebar_auto_items_{current_lang}_{_get_config_hash(config)}'
-    items = cache.get(cache_key)
-    
-    if items is None:
-        items = discover_list_urls(lang_code=current_lang)
-        cache.set(cache_key, items, timeout=config['CACHE_TIMEOUT'])
-    
-    # Filter by user permissions
-    sidebar_items = []
-    extra_groups = {}
-
-    if request.user.is_authenticated:
-        if request.user.is_superuser:
-            # Superusers see everything
-            sidebar_items = items
-        else:
-            visible = []
-            for item in items:
-                if not item.get('permissions'):
-                    visible.append(item)
-                elif any(request.user.has_perm(p) for p in item['permissions']):
-                    visible.append(item)
-            sidebar_items = visible
+        current_lang = None
+        # 1. User Preference
+        if user_prefs and 'language' in user_prefs:
+            current_lang = user_prefs.get('language')
         
-        # Process extra items for authenticated users
-        extra_groups = _process_extra_items(config, request)
-    
-    context['sidebar_auto_items'] = sidebar_items
-    context['sidebar_extra_groups'] = extra_groups
+        # 2. Session Preference (for anonymous users or overrides)
+        if not current_lang:
+            current_lang = self.request.session.get('lang')
+            
+        # 3. Default
+        if not current_lang:
+            current_lang = default_lang
+
+        # Validate the resolved language exists in available languages
+        if current_lang not in languages:
+            current_lang = default_lang if default_lang in languages else 'ar'
+        return current_lang
+
+    @cached_property
+    def lang_config(self):
+        return self.languages.get(self.current_lang, {'name': 'العربية', 'dir': 'rtl', 'flag': '🇱🇾'})
+
+    @cached_property
+    def current_dir(self):
+        return self.lang_config.get('dir', 'rtl')
+
+    @cached_property
+    def translations(self):
+        from .translations import get_strings
+
+        # Get translated strings (with project-level overrides from config)
+        project_overrides = self.app_config.get('translations', None)
+        return get_strings(self.current_lang, overrides=project_overrides)
 
-    # 6. Sidebar State (Collapsed/Expanded)
-    # Prioritize DB preference if available, else session, else default
-    session_collapsed = request.session.get('sidebarCollapsed', False)
-    db_collapsed = user_prefs.get('sidebar_collapsed', session_collapsed)
-    context['sidebar_collapsed'] = db_collapsed
+    @cached_property
+    def sidebar(self):
+        # 5. Sidebar Context (uses current_lang for translated labels)
+        request = self.request
+        sidebar_items = []
+        extra_groups = {}
 
-    return context
+        if request.user.is_authenticated:
+            config = get_sidebar_config(lang_code=self.current_lang)
+            resolved = _resolve_sidebar(request.user, self.current_lang, config)
+
+            # Only the active state is computed per request
+            path = request.path
+            sidebar_items = [
+                {**item, 'active': _is_active(path, item['url'])}
+                for item in resolved['auto_items']
+            ]
+            for group_name, group in resolved['extra_groups'].items():
+                group_items = [
+                    {**item, 'active': _is_active(path, item['url'])}
+                    for item in group['items']
+                ]
+                extra_groups[group_name] = {
+                    'icon': group['icon'],
+                    'items': group_items,
+                    'has_active': any(item['active'] for item in group_items),
+                }
+        return sidebar_items, extra_groups
+
+    @cached_property
+    def sidebar_collapsed(self):
+        # 6. Sidebar State (Collapsed/Expanded)
+        # Prioritize DB preference if available, else session, else default
+        session_collapsed = self.request.session.get('sidebarCollapsed', False)
+        return self.user_prefs.get('sidebar_collapsed', session_collapsed)
+
+def microsys_context(request):
+    """
+    Unified context processor for the entire Microsys package.
+    Combines:
+    1. Branding Configuration (APP_CONFIG)
+    2. Scope Settings
+    3. Sidebar Navigation items
+    4. Theme Settings
+
+    Values are lazy: a template that never uses them (e.g. AJAX partials)
+    triggers no sidebar discovery or DB lookups.
+    """
+    state = getattr(request, '_microsys_context', None)
+    if state is None:
+        state = request._microsys_context = _MicrosysContext(request)
+
+    return {
+        'APP_CONFIG': LazyContextValue(lambda: state.app_config),
+        'scope_settings': LazyContextValue(lambda: state.scope_settings),
+        'user_preferences': LazyContextValue(lambda: state.user_prefs),  # Injected for JS use
+        'CURRENT_LANG': LazyContextValue(lambda: state.current_lang),
+        'CURRENT_DIR': LazyContextValue(lambda: state.current_dir),
+        'LANGUAGES': LazyContextValue(lambda: state.languages),
+        'LANG_CONFIG': LazyContextValue(lambda: state.lang_config),
+        'MS_TRANS': LazyContextValue(lambda: state.translations),
+        'sidebar_auto_items': LazyContextValue(lambda: state.sidebar[0]),
+        'sidebar_extra_groups': LazyContextValue(lambda: state.sidebar[1]),
+        'sidebar_collapsed': LazyContextValue(lambda: state.sidebar_collapsed),
+    }
 
 def clear_sidebar_cache():
     """
     Clear the sidebar items cache.
     Call this when models or URLs change and sidebar needs refresh.
+    Bumps the generation counter, which orphans the cached sidebar of every
+    language, config and permission set in one step.
     """
-    # Note: We can't easily clear specific hash keys, so we might need a more robust clearing strategy
-    # or just rely on timeout. For now, this function is a placeholder or partial implementation.
-    # To truly clear, we'd need to track keys or use a specific prefix clear if supported by backend.
-    # Simpler: Just rely on short timeout during dev.
-    pass
+    reset_discovery_state()
+    bump_cache_generation(SIDEBAR_GENERATION_KEY)
@@ -8,16 +8,66 @@ from django.urls import get_resolver, URLPattern, URLResolver
 from django.apps import apps
 from django.conf import settings
 from difflib import get_close_matches
+import hashlib
+import json
+
+
+# Resolved sidebar config (and its hash) per language; rebuilt when settings change
+_SIDEBAR_CONFIG_CACHE = {}
+_SIDEBAR_CONFIG_HASHES = {}
+_REGISTRY_FINGERPRINT = None
 
 
 def get_sidebar_config(lang_code=None):
-    """Get sidebar configuration from Django settings with defaults."""
+    """Get sidebar configuration from Django settings with defaults (memoized per language)."""
+    if lang_code is None:
+        ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+        lang_code = ms_config.get('default_language', 'ar')
+
+    config = _SIDEBAR_CONFIG_CACHE.get(lang_code)
+    if config is None:
+        config = _SIDEBAR_CONFIG_CACHE[lang_code] = _build_sidebar_config(lang_code)
+    return config
+
+
+def get_sidebar_config_hash(lang_code=None):
+    """Short hash of the sidebar config, used in sidebar cache keys."""
+    config_hash = _SIDEBAR_CONFIG_HASHES.get(lang_code)
+    if config_hash is None:
+        config = get_sidebar_config(lang_code=lang_code)
+        config_str = json.dumps(config, sort_keys=True, default=str)
+        config_hash = _SIDEBAR_CONFIG_HASHES[lang_code] = hashlib.md5(config_str.encode()).hexdigest()[:8]
+    return config_hash
+
+
+def get_registry_fingerprint():
+    """
+    Short hash of the installed models and named URL patterns (computed once per process).
+    Part of every sidebar cache key, so a deploy that changes models or URLs
+    never serves a sidebar cached by the previous code.
+    """
+    global _REGISTRY_FINGERPRINT
+    if _REGISTRY_FINGERPRINT is None:
+        models = sorted(m._meta.label_lower for m in apps.get_models())
+        url_names = sorted(_iterate_routes(get_resolver().url_patterns))
+        raw = json.dumps([models, url_names])
+        _REGISTRY_FINGERPRINT = hashlib.md5(raw.encode()).hexdigest()[:8]
+    return _REGISTRY_FINGERPRINT
+
+
+def reset_discovery_state():
+    """Drop the per-process sidebar config and registry fingerprint."""
+    global _REGISTRY_FINGERPRINT
+    _SIDEBAR_CONFIG_CACHE.clear()
+    _SIDEBAR_CONFIG_HASHES.clear()
+    _REGISTRY_FINGERPRINT = None
+
+
+def _build_sidebar_config(lang_code):
     from .translations import get_strings
 
     # Resolve language for sidebar labels
     ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
-    if lang_code is None:
-        lang_code = ms_config.get('default_language', 'ar')
     project_overrides = ms_config.get('translations', None)
     strings = get_strings(lang_code, overrides=project_overrides)
 
@@ -116,6 +166,7 @@ def discover_list_urls(lang_code=None):
         return []
     
     resolver = get_resolver()
+    index = _build_model_index(config)
     items = []
     
     for pattern in _iterate_patterns(resolver.url_patterns):
@@ -139,11 +190,11 @@ def discover_list_urls(lang_code=None):
             # Try to find model - first with stripped hint, then with keyword itself
             model = None
             if model_hint:
-                model = _find_model(model_hint, config)
+                model = _find_model(model_hint, config, index)
             
             # If no model found and keyword looks like it could be a model name, try that
             if not model and matched_keyword not in ['list', 'index', 'view', 'page']:
-                model = _find_model(matched_keyword, config)
+                model = _find_model(matched_keyword, config, index)
             
             if model:
                 # Check exclusions
@@ -188,35 +239,73 @@ def _iterate_patterns(patterns, prefix=''):
             yield pattern
 
 
-def _find_model(hint, config):
+def _iterate_routes(patterns, prefix=''):
+    """Yield 'name:full/route/' for every URL pattern (names alone miss moved includes)."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iterate_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield f"{pattern.name or ''}:{prefix}{pattern.pattern}"
+
+
+def _build_model_index(config):
+    """
+    Build the name lookup used by _find_model (once per discovery pass).
+    Fuzzy matches are memoized per hint in the index as well.
+    """
+    names = {}
+    for m in apps.get_models():
+        if m._meta.app_label not in config['EXCLUDE_APPS']:
+            names[m.__name__.lower()] = m
+    return {'names': names, 'fuzzy': {}}
+
+
+def _hint_variants(hint_lower):
+    """Candidate model names for a hint: as is, singular, and without separators (snake/kebab case)."""
+    variants = [hint_lower]
+    # Handle common pluralization (simple 's' suffix)
+    if hint_lower.endswith('s'):
+        variants.append(hint_lower[:-1])
+
+    compact = hint_lower.replace('_', '').replace('-', '')
+    for base in (hint_lower, compact):
+        if base != hint_lower:
+            variants.append(base)
+            if base.endswith('s'):
+                variants.append(base[:-1])
+        if base.endswith('ies'):
+            variants.append(base[:-3] + 'y')
+        if base.endswith('es'):
+            variants.append(base[:-2])
+    return variants
+
+
+def _find_model(hint, config, index=None):
     """
     Find model by name using exact and fuzzy matching.
     
     Args:
         hint: The model name hint extracted from URL
         config: Sidebar configuration dictionary
+        index: Lookup from _build_model_index (built on the fly if omitted)
         
     Returns:
         Model class or None if not found
     """
-    all_models = apps.get_models()
-    
-    # Build lookup excluding configured apps
-    model_names = {}
-    for m in all_models:
-        if m._meta.app_label not in config['EXCLUDE_APPS']:
-            model_names[m.__name__.lower()] = m
+    if index is None:
+        index = _build_model_index(config)
+    model_names = index['names']
     
     hint_lower = hint.lower()
     
-    # Exact match first
-    if hint_lower in model_names:
-        return model_names[hint_lower]
-    
-    # Handle common pluralization (simple 's' suffix)
-    if hint_lower.endswith('s') and hint_lower[:-1] in model_names:
-        return model_names[hint_lower[:-1]]
+    # Exact match first, then plural / snake_case variants
+    for variant in _hint_variants(hint_lower):
+        if variant in model_names:
+            return model_names[variant]
     
     # Fuzzy match as fallback
-    matches = get_close_matches(hint_lower, model_names.keys(), n=1, cutoff=0.8)
-    return model_names[matches[0]] if matches else None
+    fuzzy = index['fuzzy']
+    if hint_lower not in fuzzy:
+        matches = get_close_matches(hint_lower, model_names.keys(), n=1, cutoff=0.8)
+        fuzzy[hint_lower] = model_names[matches[0]] if matches else None
+    return fuzzy[hint_lower]
@@ -1,14 +1,31 @@
 # Fundemental imports
 #####################################################################
 from django.shortcuts import get_object_or_404
-from django.http import JsonResponse, HttpResponse, HttpResponseRedirect
+from django.http import JsonResponse, HttpResponse, HttpResponseRedirect, FileResponse, StreamingHttpResponse
+from django.db.models import Max, Min
 from django.db.models.query import QuerySet
 from django.contrib import messages
-from io import BytesIO
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models as dj_models
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+import csv
+import hashlib
+import json
 import mimetypes
+import re
+import tempfile
+import time
+from datetime import datetime
 import openpyxl
 import zipfile
 from django.apps import apps
+from django.conf import settings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 
 # Universal Downloader
 #####################################################################
@@ -131,14 +148,78 @@ def downloader(request, records, file_type=None):
 
     # If only one matching file exists, serve it directly
     if len(files_data) == 1:
-        return serve_single_file(files_data[0])
+        return serve_single_file(files_data[0], request)
 
     # If multiple files match, create a ZIP archive
     return serve_zip_file(files_data)
 
+# Bytes read per chunk when streaming files to the client
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def _file_validators(file_obj):
+    """Returns (etag, last_modified timestamp) for a stored file; either may be None."""
+    try:
+        size = file_obj.size
+    except Exception:
+        return None, None
+    try:
+        last_modified = int(file_obj.storage.get_modified_time(file_obj.name).timestamp())
+    except Exception:
+        last_modified = None
+    raw = f"{file_obj.name}:{size}:{last_modified}"
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), last_modified
+
+def _parse_range(header, size):
+    """
+    Parses a single 'bytes=start-end' Range header.
+    Returns (start, end) inclusive, None to serve the whole file, or False if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None  # Malformed or multi-range: ignore and send everything
+    start, end = match.groups()
+    if start == '':
+        # Suffix range: the last N bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        if end and int(end) < int(start):
+            return None  # Invalid (last byte before first): ignored like a malformed header
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start >= size:
+        return False
+    return start, end
+
+def _set_validator_headers(response, etag, last_modified):
+    """Sets Accept-Ranges, ETag and Last-Modified on a file response."""
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+
+def _iter_file_range(f, start, length, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Yields `length` bytes of an open file from `start`, then closes it."""
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
 # Sub Function in charge of serving a single file to the client
-def serve_single_file(file_info):
-    """Serves a single file with the correct Content-Disposition header."""
+def serve_single_file(file_info, request=None):
+    """
+    Streams a single file with the correct Content-Disposition header.
+
+    The file is read in DOWNLOAD_CHUNK_SIZE chunks (FileResponse, so local
+    storage can use the server's sendfile path). With a request, ETag and
+    Last-Modified are honoured (304) and single byte ranges get a 206.
+    """
 
     file_obj = file_info.get("file")
     if not file_obj or not file_obj.name:
@@ -153,21 +234,230 @@ def serve_single_file(file_info):
     filename = f"{model_name}_{number}_{date_str}.{ext}"
 
     # Determine content type
-    content_type, _ = mimetypes.guess_type(file_obj.name) or ('application/octet-stream',)
-    
-    # Create response
-    response = HttpResponse(content_type=content_type)
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    content_type = mimetypes.guess_type(file_obj.name)[0] or 'application/octet-stream'
+
+    etag, last_modified = _file_validators(file_obj)
+    if request is not None:
+        # If-None-Match / If-Modified-Since -> 304, failed If-Match -> 412
+        conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if conditional is not None:
+            if conditional.status_code == 304:
+                # The client refreshes its cached validators from the 304
+                _set_validator_headers(conditional, etag, last_modified)
+            return conditional
 
-    # Serve file
-    with file_obj.open('rb') as f:
-        response.write(f.read())
+    try:
+        f = file_obj.open('rb')
+    except FileNotFoundError:
+        return JsonResponse({'error': 'File not found'}, status=404)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE') if request is not None else None
+    if range_header and etag and f.seekable():
+        # If-Range: only send a part when the client's copy is still current
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or if_range == etag or (
+            last_modified is not None and parse_http_date_safe(if_range) == last_modified
+        ):
+            byte_range = _parse_range(range_header, file_obj.size)
+
+    if byte_range is False:
+        f.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{file_obj.size}'
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _iter_file_range(f, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{file_obj.size}'
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    else:
+        response = FileResponse(f, as_attachment=True, filename=filename, content_type=content_type)
+        response.block_size = DOWNLOAD_CHUNK_SIZE
 
+    _set_validator_headers(response, etag, last_modified)
     return response
 
+# Formats that are already compressed: stored as-is instead of deflated again
+ZIP_STORED_EXTENSIONS = {
+    'pdf', 'jpg', 'jpeg', 'png', 'gif', 'webp', 'heic',
+    'docx', 'xlsx', 'pptx', 'odt', 'ods',
+    'zip', 'rar', '7z', 'gz', 'bz2', 'xz',
+    'mp3', 'mp4', 'm4a', 'mov', 'avi', 'mkv',
+}
+
+class _ZipStreamBuffer:
+    """Write-only, unseekable sink for ZipFile; collects output until popped."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _zip_member_info(filename, file_obj):
+    """ZipInfo for a member: stored or deflated by extension, sized when the storage knows it."""
+    zinfo = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+    zinfo.external_attr = 0o644 << 16
+    ext = filename.rsplit('.', 1)[-1].lower()
+    zinfo.compress_type = zipfile.ZIP_STORED if ext in ZIP_STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    try:
+        zinfo.file_size = file_obj.size
+    except Exception:
+        zinfo.file_size = None
+    return zinfo
+
+# Defaults for MICROSYS_CONFIG['downloads']
+DEFAULT_PREFETCH_WORKERS = 4
+DEFAULT_PREFETCH_MAX_BYTES = 32 * 1024 * 1024
+
+def _read_member(file_obj):
+    with file_obj.open('rb') as f:
+        return f.read()
+
+def _member_size(file_obj):
+    try:
+        return file_obj.size
+    except Exception:
+        return None
+
+def _prefetch_members(members, workers=None, max_bytes=None):
+    """
+    Yields (filename, file_obj, data) in the original order while a bounded
+    thread pool reads the following members ahead of time.
+
+    Members whose size is known and fits in `max_bytes` are read by the pool
+    (data is their bytes); at most `workers` reads are in flight and the
+    bytes read ahead never add up to more than `max_bytes`. Other members come back
+    with data=None and are streamed by the caller. Members that fail to
+    read are skipped. Limits default to MICROSYS_CONFIG['downloads']
+    'prefetch_workers' (4, 0 disables) and 'prefetch_max_bytes' (32 MB).
+    """
+    config = getattr(settings, 'MICROSYS_CONFIG', {}).get('downloads', {})
+    if workers is None:
+        workers = config.get('prefetch_workers', DEFAULT_PREFETCH_WORKERS)
+    if max_bytes is None:
+        max_bytes = config.get('prefetch_max_bytes', DEFAULT_PREFETCH_MAX_BYTES)
+
+    if workers <= 0:
+        for filename, file_obj in members:
+            yield filename, file_obj, None
+        return
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='microsys-prefetch')
+    upcoming = iter(members)
+    # Entries: [filename, file_obj, future (None: streamed by caller, False: not submitted yet), size]
+    window = deque()
+    state = {'in_flight': 0, 'reserved': 0, 'done': False}
+
+    def submit(entry):
+        entry[2] = executor.submit(_read_member, entry[1])
+        state['in_flight'] += 1
+        state['reserved'] += entry[3]
+
+    def fits(size):
+        return state['reserved'] + size <= max_bytes or not state['in_flight']
+
+    def fill():
+        # A member held back by the memory cap goes first, once there is room
+        for entry in window:
+            if entry[2] is False:
+                if not fits(entry[3]):
+                    return
+                submit(entry)
+                break
+        # Bounded lookahead, so direct members do not pile up either
+        while not state['done'] and state['in_flight'] < workers and len(window) < 2 * workers:
+            try:
+                filename, file_obj = next(upcoming)
+            except StopIteration:
+                state['done'] = True
+                return
+            size = _member_size(file_obj)
+            if size is None or size > max_bytes:
+                window.append([filename, file_obj, None, 0])
+                continue
+            entry = [filename, file_obj, False, size]
+            window.append(entry)
+            if not fits(size):
+                return
+            submit(entry)
+
+    try:
+        fill()
+        while window:
+            entry = window.popleft()
+            filename, file_obj, future, size = entry
+            if future is None:
+                fill()
+                yield filename, file_obj, None
+                continue
+            if future is False:
+                submit(entry)
+                future = entry[2]
+            try:
+                data = future.result()
+            except Exception:
+                data = None
+            state['in_flight'] -= 1
+            state['reserved'] -= size
+            fill()
+            if data is not None:
+                yield filename, file_obj, data
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _iter_zip(members, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Yields a ZIP archive of (filename, file_obj) members as it is built.
+    Members are read ahead by _prefetch_members, written in chunks, and
+    skipped if missing; sizes are written in data descriptors, with ZIP64
+    records when needed.
+    """
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+        for filename, file_obj, data in _prefetch_members(members):
+            if data is None:
+                try:
+                    src = file_obj.open('rb')
+                except (FileNotFoundError, OSError):
+                    continue
+            else:
+                src = BytesIO(data)
+            zinfo = _zip_member_info(filename, file_obj)
+            if data is not None:
+                zinfo.file_size = len(data)
+            # Unknown size: reserve ZIP64 fields up front in case it is large
+            force_zip64 = zinfo.file_size is None
+            if force_zip64:
+                zinfo.file_size = 0
+            with src, zip_file.open(zinfo, 'w', force_zip64=force_zip64) as dest:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    output = buffer.pop()
+                    if output:
+                        yield output
+            yield buffer.pop()
+    # Central directory
+    yield buffer.pop()
+
 # Sub Function in charge of serving a zip file to the client
 def serve_zip_file(files_data):
-    """Zips multiple files and serves as a downloadable response."""
+    """Streams multiple files as a ZIP archive, built while it is sent."""
     
     # Assume all files are from the same model
     model_name = files_data[0].get("model_name", "documents")
@@ -177,84 +467,238 @@ def serve_zip_file(files_data):
     # Sort the numbers to find the first and last
     first_number = min(numbers)
     last_number = max(numbers)
-    
-    zip_buffer = BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for file_info in files_data:
-            file_obj = file_info.get("file")
-            if file_obj and file_obj.name:
-                number = file_info.get("number", "unknown")
-                date_str = file_info.get("date", "unknown_date")
-                ext = file_obj.name.split('.')[-1]
-                filename = f"{model_name}_{number}_{date_str}.{ext}"
-                
-                with file_obj.open('rb') as f:
-                    zip_file.writestr(filename, f.read())
+
+    members = []
+    for file_info in files_data:
+        file_obj = file_info.get("file")
+        if file_obj and file_obj.name:
+            number = file_info.get("number", "unknown")
+            date_str = file_info.get("date", "unknown_date")
+            ext = file_obj.name.split('.')[-1]
+            members.append((f"{model_name}_{number}_{date_str}.{ext}", file_obj))
 
     # Create the zip file name using first_number-last_number
     zip_filename = f"{model_name}_{first_number}-{last_number}.zip"
 
     # Serve ZIP file
-    zip_buffer.seek(0)
-    response = HttpResponse(zip_buffer.getvalue(), content_type="application/zip")
+    response = StreamingHttpResponse(_iter_zip(members), content_type="application/zip")
     response["Content-Disposition"] = f'attachment; filename="{zip_filename}"'
     return response
 
 # Excel Exporter
 #####################################################################
+# Rows fetched per database round-trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+def _model_field(model, attr):
+    try:
+        return model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        return None
+
+def _export_column(model, attr):
+    """
+    Returns (values_list lookup or None, kind) for one mapped attribute.
+    ForeignKeys export their related `name` column; attributes that are not
+    plain fields (properties, reverse/M2M relations, related models without
+    a name) have no lookup and are read from the instance. `kind` is one of
+    'text', 'number', 'date', 'datetime', 'bool'.
+    """
+    field = _model_field(model, attr)
+    if field is None or not field.concrete or field.many_to_many:
+        return None, 'text'
+    if field.is_relation:
+        try:
+            name_field = field.related_model._meta.get_field('name')
+        except FieldDoesNotExist:
+            return None, 'text'
+        if not name_field.concrete or name_field.is_relation:
+            return None, 'text'
+        return f"{attr}__name", 'text'
+    if isinstance(field, dj_models.DateTimeField):
+        return attr, 'datetime'
+    if isinstance(field, dj_models.DateField):
+        return attr, 'date'
+    if isinstance(field, dj_models.BooleanField):
+        return attr, 'bool'
+    if isinstance(field, (dj_models.IntegerField, dj_models.FloatField, dj_models.DecimalField)) and not field.choices:
+        return attr, 'number'
+    return attr, 'text'
+
+def _export_cell(value, kind, blank=""):
+    """Converts a fetched value for its column kind; None becomes `blank` (an empty cell)."""
+    if value is None:
+        return blank
+    if kind == 'datetime':
+        # Spreadsheets have no time zones: export local wall-clock time
+        return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+    if kind in ('date', 'number', 'bool'):
+        return value
+    return str(value)
+
+def _instance_cell(obj, attr):
+    value = getattr(obj, attr, "")
+    # If attribute is a ForeignKey or Object
+    if isinstance(value, dj_models.Model):
+        return value.name if hasattr(value, "name") else str(value)
+    return value
+
+def iter_export_rows(queryset, headers_map, chunk_size=EXPORT_CHUNK_SIZE, numbers=None, blank=""):
+    """
+    Yields one tuple of cell values per record, in headers_map order.
+
+    QuerySets are streamed with .iterator(chunk_size): through a single
+    values_list when every column maps to a database lookup, otherwise as
+    instances with their ForeignKey columns select_related. Lists of
+    instances are read attribute by attribute.
+
+    If a dict is passed as `numbers`, it receives the 'first' and 'last'
+    record `number` seen during the pass (for the export filename).
+    Missing values are returned as `blank` ("" for spreadsheets and CSV).
+    """
+    attrs = [attr for _, attr in headers_map]
+    if isinstance(queryset, QuerySet):
+        model = queryset.model
+    else:
+        model = type(queryset[0]) if queryset and isinstance(queryset[0], dj_models.Model) else None
+    columns = [_export_column(model, attr) for attr in attrs] if model else [(None, 'text')] * len(attrs)
+    kinds = [kind for _, kind in columns]
+    track = numbers is not None
+
+    if isinstance(queryset, QuerySet):
+        lookups = [lookup for lookup, _ in columns]
+        if all(lookups):
+            # Fetch the number alongside the columns when it is not one of them
+            number_index = lookups.index('number') if 'number' in lookups else None
+            if track and number_index is None and _has_number_field(model):
+                lookups.append('number')
+                number_index = len(lookups) - 1
+            for values in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+                if track and number_index is not None:
+                    numbers.setdefault('first', values[number_index])
+                    numbers['last'] = values[number_index]
+                yield tuple(_export_cell(value, kind, blank) for value, kind in zip(values, kinds))
+            return
+        relations = [
+            attr for attr in attrs
+            if (field := _model_field(model, attr)) is not None and (field.many_to_one or field.one_to_one)
+        ]
+        if relations:
+            queryset = queryset.select_related(*relations)
+        records = queryset.iterator(chunk_size=chunk_size)
+    else:
+        records = queryset
+
+    for obj in records:
+        if track and hasattr(obj, 'number'):
+            numbers.setdefault('first', obj.number)
+            numbers['last'] = obj.number
+        yield tuple(_export_cell(_instance_cell(obj, attr), kind, blank) for attr, kind in zip(attrs, kinds))
+
+def _has_number_field(model):
+    field = _model_field(model, 'number')
+    return field is not None and field.concrete and not field.is_relation
+
+def _export_filename(ext, first_number=None, last_number=None):
+    """'<first number>-<last number>.<ext>'; missing numbers become 0."""
+    first_number = "0" if first_number is None else first_number
+    last_number = "0" if last_number is None else last_number
+    return f"{first_number}-{last_number}.{ext}"
+
+def _export_filename_before_pass(queryset, ext):
+    """
+    Export filename for responses whose headers go out before the rows.
+    Lists are read directly; querysets cost one Min/Max aggregate, and only
+    when the model has a number field.
+    """
+    if isinstance(queryset, list):
+        first_item = queryset[0] if queryset else None
+        last_item = queryset[-1] if queryset else None
+        return _export_filename(ext, getattr(first_item, "number", None), getattr(last_item, "number", None))
+    if not _has_number_field(queryset.model):
+        return _export_filename(ext)
+    bounds = queryset.aggregate(first=Min('number'), last=Max('number'))
+    return _export_filename(ext, bounds['first'], bounds['last'])
+
 # Function to export any list of documents to Excel
 def export_to_excel(request, queryset, headers_map, sheet_title="Documents"):
     """
     Generic function to export any document queryset to Excel.
 
+    Rows are streamed from the database (see iter_export_rows) into a
+    write-only workbook, which is saved to a temporary file and sent from
+    there, so memory stays flat however many rows are exported.
+
     :param request: Django request object
     :param queryset: queryset or list of model instances
     :param headers_map: list of tuples (Excel Header, attribute_name)
     :param sheet_title: Name of Excel sheet
-    :return: HttpResponse with Excel file
+    :return: FileResponse with Excel file
     """
 
-    if isinstance(queryset, list):
-        first_item = queryset[0] if queryset else None
-        last_item = queryset[-1] if queryset else None
-    else:
-        first_item = queryset.first()
-        last_item = queryset.last()
-
     # Create workbook and sheet
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = sheet_title
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
 
     # Add headers
     headers = [h for h, _ in headers_map]
     ws.append(headers)
 
-    # Add rows
-    for obj in queryset:
-        row = []
-        for _, attr in headers_map:
-            value = getattr(obj, attr, "")
-            # If attribute is a ForeignKey or Object
-            if value:
-                if hasattr(value, "name"):
-                    value = value.name
-                else:
-                    value = str(value)
-            row.append(value if value is not None else "")
+    # Add rows, noting the first and last number for the filename on the way
+    numbers = {}
+    for row in iter_export_rows(queryset, headers_map, numbers=numbers):
         ws.append(row)
 
-    # Filename
-    first_number = getattr(first_item, "number", "0")
-    last_number = getattr(last_item, "number", "0")
-    filename = f"{first_number}-{last_number}.xlsx"
-
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    filename = _export_filename("xlsx", numbers.get('first'), numbers.get('last'))
+
+    # Prepare response from a temporary file (removed once closed)
+    spool = tempfile.TemporaryFile()
+    wb.save(spool)
+    spool.seek(0)
+    return FileResponse(
+        spool,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
+
+class _Echo:
+    """File-like object whose write() returns the data, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+def _iter_csv(queryset, headers_map):
+    writer = csv.writer(_Echo())
+    # UTF-8 BOM so Excel opens Arabic text correctly
+    yield '\ufeff' + writer.writerow([h for h, _ in headers_map])
+    for row in iter_export_rows(queryset, headers_map):
+        yield writer.writerow([value.isoformat(sep=' ') if isinstance(value, datetime) else value for value in row])
+
+def _iter_ndjson(queryset, headers_map):
+    attrs = [attr for _, attr in headers_map]
+    # Keep missing values as null rather than the spreadsheet blank cell
+    for row in iter_export_rows(queryset, headers_map, blank=None):
+        yield json.dumps(dict(zip(attrs, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+# Function to stream any list of documents as CSV
+def export_to_csv(request, queryset, headers_map):
+    """
+    Streams a queryset as CSV (UTF-8 with BOM), one line per record.
+    Takes the same headers_map as export_to_excel; the header row uses its labels.
+    """
+    response = StreamingHttpResponse(_iter_csv(queryset, headers_map), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = content_disposition_header(True, _export_filename_before_pass(queryset, "csv"))
+    return response
+
+# Function to stream any list of documents as NDJSON
+def export_to_ndjson(request, queryset, headers_map):
+    """
+    Streams a queryset as newline-delimited JSON, one object per record
+    keyed by the attribute names of headers_map.
+    """
+    response = StreamingHttpResponse(_iter_ndjson(queryset, headers_map), content_type='application/x-ndjson')
+    response['Content-Disposition'] = content_disposition_header(True, _export_filename_before_pass(queryset, "ndjson"))
     return response
 
 # Headers for export_to_excel function
@@ -16,6 +16,7 @@ from django.apps import apps
 from django.forms.widgets import ChoiceWidget
 from django.conf import settings
 from .translations import get_strings
+from .utils import is_scope_enabled
 
 User = get_user_model()
 
@@ -293,8 +294,7 @@ class CustomUserCreationForm(UserCreationForm):
             user_perms = self.user_context.user_permissions.all() | Permissions.objects.filter(group__user=self.user_context)
             self.fields['permissions'].queryset = self.fields['permissions'].queryset.filter(id__in=user_perms.values_list('id', flat=True))
         
-        ScopeSettings = apps.get_model('microsys', 'ScopeSettings')
-        scope_enabled = ScopeSettings.load().is_enabled
+        scope_enabled = is_scope_enabled()
 
         lock_scope = bool(
             self.user_context
@@ -492,8 +492,7 @@ class CustomUserChangeForm(UserChangeForm):
         if user_instance:
             self.fields["permissions"].initial = user_instance.user_permissions.all()
 
-        ScopeSettings = apps.get_model('microsys', 'ScopeSettings')
-        scope_enabled = ScopeSettings.load().is_enabled
+        scope_enabled = is_scope_enabled()
 
         lock_scope = bool(
             self.user_context
@@ -736,3 +735,100 @@ class ScopeForm(forms.ModelForm):
         self.helper.layout = Layout(
             Field('name', css_class='col-12'),
         )
+
+
+DEFAULT_SUBSECTION_CHOICES_LIMIT = 200
+
+
+class _CachedChoiceIterator(forms.models.ModelChoiceIterator):
+    """Yields the rows loaded once by SubsectionChoiceField instead of re-running the queryset."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.choice_rows():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.choice_rows()) + (self.field.empty_label is not None)
+
+
+class SubsectionChoiceField(forms.ModelMultipleChoiceField):
+    """
+    Checkbox field for subsection (child model) selection.
+
+    The child queryset (already scope-filtered by its manager) is evaluated
+    once per field and shared by widget rendering and validation. Child
+    tables larger than `limit` (MICROSYS_CONFIG['subsection_choices_limit'],
+    default 200) are truncated: only the first `limit` rows plus the
+    `selected` ones are rendered, `truncated` is set, and further rows are
+    found through the subsection_choices search endpoint.
+    """
+    iterator = _CachedChoiceIterator
+
+    def __init__(self, queryset, *, limit=None, **kwargs):
+        kwargs.setdefault('widget', forms.CheckboxSelectMultiple())
+        if limit is None:
+            ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+            limit = ms_config.get('subsection_choices_limit', DEFAULT_SUBSECTION_CHOICES_LIMIT)
+        self.limit = limit
+        self.selected = []
+        self.truncated = False
+        self._rows = None
+        super().__init__(queryset, **kwargs)
+
+    def _set_queryset(self, queryset):
+        self._rows = None
+        super()._set_queryset(queryset)
+
+    queryset = property(forms.ModelChoiceField._get_queryset, _set_queryset)
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result._rows = None
+        result.selected = list(self.selected)
+        return result
+
+    def choice_rows(self):
+        """Child rows to render, evaluated once."""
+        if self._rows is None:
+            queryset = self.queryset
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            rows = list(queryset[:self.limit + 1])
+            self.truncated = len(rows) > self.limit
+            if self.truncated:
+                rows = rows[:self.limit]
+                shown = {str(obj.pk) for obj in rows}
+                missing = []
+                for value in self.selected:
+                    # Posted values are unvalidated here; bad ones are rejected by _check_values
+                    try:
+                        pk = queryset.model._meta.pk.to_python(value)
+                    except ValidationError:
+                        continue
+                    if pk is not None and str(pk) not in shown:
+                        missing.append(pk)
+                if missing:
+                    rows.extend(queryset.filter(pk__in=missing))
+            self._rows = rows
+        return self._rows
+
+    def _check_values(self, value):
+        rows = self.choice_rows()
+        if self.truncated or self.to_field_name:
+            return super()._check_values(value)
+        # Every child row is loaded: validate against it without another query
+        by_pk = {str(obj.pk): obj for obj in rows}
+        try:
+            value = frozenset(value)
+        except TypeError:
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        for val in value:
+            if str(val) not in by_pk:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': val},
+                )
+        return [by_pk[str(val)] for val in value]
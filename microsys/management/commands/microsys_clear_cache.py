@@ -0,0 +1,22 @@
+# microsys/management/commands/microsys_clear_cache.py
+"""
+Management command to invalidate the cached sidebar and section registry.
+Run it after changing sidebar settings, URLs or models without a migrate,
+e.g. when SIDEBAR_AUTO['CACHE_TIMEOUT'] is None.
+"""
+from django.core.management.base import BaseCommand
+
+from microsys.context_processors import clear_sidebar_cache, get_sidebar_generation
+from microsys.utils import clear_section_registry
+
+
+class Command(BaseCommand):
+    help = 'Invalidate all cached microsys sidebars (every language and permission set) and section models'
+
+    def handle(self, *args, **options):
+        clear_sidebar_cache()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Sidebar cache cleared (generation {get_sidebar_generation()})'
+        ))
+        clear_section_registry()
+        self.stdout.write(self.style.SUCCESS('✓ Section registry cleared'))
@@ -1,8 +1,49 @@
 from django.db import models
-from django.apps import apps
 from .middleware import get_current_user
+from .activity import BULK_ID_LIST_LIMIT, bulk_activity_log, bulk_summary_enabled, collect_bulk_rows, collect_bulk_stats
 
-class ScopedManager(models.Manager):
+class ScopedQuerySet(models.QuerySet):
+    """
+    QuerySet whose bulk writes (delete, update, bulk_create) are written to the
+    activity log as one summary entry per operation when bulk logging is active
+    (inside `bulk_activity_log()` or with 'bulk_summary' enabled in settings).
+    """
+
+    def delete(self):
+        if not bulk_summary_enabled():
+            return super().delete()
+        # Per-row post_delete logs are collected into the summary
+        with bulk_activity_log():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def update(self, **kwargs):
+        if not bulk_summary_enabled():
+            return super().update(**kwargs)
+        from .signals import get_logging_policy
+        if get_logging_policy(self.model)['skip']:
+            return super().update(**kwargs)
+        with bulk_activity_log():
+            # Summary stats without reading every pk: one aggregate and a short pk list
+            rows = self.order_by()
+            stats = rows.aggregate(count=models.Count('pk'), first=models.Min('pk'), last=models.Max('pk'))
+            ids = list(rows.values_list('pk', flat=True)[:BULK_ID_LIST_LIMIT + 1]) if stats['count'] else []
+            collect_bulk_stats(self.model, 'UPDATE', stats['count'], stats['first'], stats['last'], ids)
+            return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if bulk_summary_enabled():
+            with bulk_activity_log():
+                collect_bulk_rows(self.model, 'CREATE', [obj.pk for obj in objs])
+        return objs
+
+
+class ScopedManager(models.Manager.from_queryset(ScopedQuerySet)):
     """
     A manager that automatically filters queries by the current user's scope.
     Also handles soft-deletion if 'deleted_at' field is present.
@@ -25,8 +66,8 @@ class ScopedManager(models.Manager):
         # 2. Scope Filtering
         # Check if Scope system is globally enabled
         try:
-            ScopeSettings = apps.get_model('microsys', 'ScopeSettings')
-            if not ScopeSettings.load().is_enabled:
+            from .utils import is_scope_enabled
+            if not is_scope_enabled():
                 return qs
         except (LookupError, Exception):
             # If ScopeSettings table doesn't exist yet (e.g. migration), skip
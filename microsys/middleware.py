@@ -1,32 +1,78 @@
+from contextvars import ContextVar
 
-import threading
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 
-_thread_locals = threading.local()
+from .activity import flush_activity_log, bind_activity_state, reset_activity_state
+
+# Context variables are isolated per request under both WSGI threads and ASGI
+# coroutines, and are propagated into sync_to_async/async_to_sync calls.
+_current_user = ContextVar('microsys_current_user', default=None)
+_current_request = ContextVar('microsys_current_request', default=None)
 
 def get_current_user():
-    return getattr(_thread_locals, 'user', None)
+    return _current_user.get()
 
 def get_current_request():
-    return getattr(_thread_locals, 'request', None)
+    return _current_request.get()
+
+def set_current_user(user):
+    """Bind a user for code running outside a request (tests, commands). Returns a reset token."""
+    return _current_user.set(user)
+
+def reset_current_user(token):
+    _current_user.reset(token)
 
 class ActivityLogMiddleware:
     """
-    Middleware to capture the current request and user in a thread-local variable.
+    Middleware to capture the current request and user in context variables.
     This allows access to the user in signals where request is not available.
+    Works in both sync (WSGI) and async (ASGI) middleware chains.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _bind(self, request):
+        return (
+            _current_user.set(getattr(request, 'user', None)),
+            _current_request.set(request),
+            bind_activity_state(),
+        )
+
+    def _unbind(self, tokens):
+        # Reset so nothing leaks into the next request handled by this thread/task
+        user_token, request_token, state_token = tokens
+        reset_activity_state(state_token)
+        _current_request.reset(request_token)
+        _current_user.reset(user_token)
 
     def __call__(self, request):
-        _thread_locals.user = getattr(request, 'user', None)
-        _thread_locals.request = request
-        
-        response = self.get_response(request)
-        
-        # Clean up to prevent memory leaks or data pollution in reused threads
-        if hasattr(_thread_locals, 'user'):
-            del _thread_locals.user
-        if hasattr(_thread_locals, 'request'):
-            del _thread_locals.request
-            
+        if self.async_mode:
+            return self.__acall__(request)
+
+        tokens = self._bind(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            # Write any buffered activity logs in one round-trip
+            try:
+                flush_activity_log()
+            finally:
+                self._unbind(tokens)
+        return response
+
+    async def __acall__(self, request):
+        tokens = self._bind(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            try:
+                await sync_to_async(flush_activity_log)()
+            finally:
+                self._unbind(tokens)
         return response
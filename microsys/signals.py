@@ -1,12 +1,23 @@
 # Imports of the required python modules and libraries
 ######################################################
 from django.dispatch import receiver
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, pre_save, post_init, class_prepared, post_migrate
 from django.utils.timezone import now
 from django.apps import apps
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, setting_changed
+from django.utils.autoreload import file_changed
 from .middleware import get_current_user, get_current_request
+from .activity import (
+    write_activity_log, flush_activity_log, get_activity_log_config,
+    collect_bulk_rows, format_bulk_ids,
+)
+from .utils import (
+    set_scope_enabled_cache, clear_section_registry, clear_convention_import_cache,
+    clear_model_name_index, clear_section_counts, _model_is_section,
+)
+from .context_processors import clear_sidebar_cache
 
 def get_client_ip(request):
     """Extract client IP address from request."""
@@ -22,8 +33,7 @@ def get_client_ip(request):
 @receiver(user_logged_in)
 def log_login(sender, request, user, **kwargs):
     """Log user login actions."""
-    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
-    UserActivityLog.objects.create(
+    write_activity_log(
         user=user,
         action="LOGIN",
         model_name="auth",
@@ -36,8 +46,7 @@ def log_login(sender, request, user, **kwargs):
 @receiver(user_logged_out)
 def log_logout(sender, request, user, **kwargs):
     """Log user logout actions."""
-    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
-    UserActivityLog.objects.create(
+    write_activity_log(
         user=user,
         action="LOGOUT",
         model_name="auth",
@@ -47,10 +56,102 @@ def log_logout(sender, request, user, **kwargs):
         timestamp=now(),
     )
 
+@receiver(post_save, sender='microsys.ScopeSettings')
+def refresh_scope_settings_cache(sender, instance, **kwargs):
+    """Keep the cached scope flag in sync when ScopeSettings is saved."""
+    set_scope_enabled_cache(instance.is_enabled)
+
+@receiver(post_delete, sender='microsys.ScopeSettings')
+def clear_scope_settings_cache(sender, instance, **kwargs):
+    """Drop the cached scope flag when ScopeSettings is removed."""
+    set_scope_enabled_cache(None)
+
+# Settings that change what the sidebar shows or where its links point
+SIDEBAR_SETTINGS = {'SIDEBAR_AUTO', 'MICROSYS_CONFIG', 'ROOT_URLCONF', 'INSTALLED_APPS'}
+
+@receiver(setting_changed)
+def reset_sidebar_cache(sender, setting, **kwargs):
+    """Invalidate cached sidebars and sections when sidebar, URL or app settings change."""
+    if setting in SIDEBAR_SETTINGS:
+        clear_sidebar_cache()
+    if setting == 'INSTALLED_APPS':
+        clear_section_registry()
+        clear_model_name_index()
+
+@receiver(post_migrate)
+def refresh_caches_after_migrate(sender, **kwargs):
+    """Models may have been added or removed: invalidate cached sidebars and sections (once per migrate)."""
+    if sender.label == 'microsys':
+        clear_sidebar_cache()
+        clear_section_registry()
+
+@receiver([post_save, post_delete])
+def refresh_section_counts(sender, **kwargs):
+    """Drop the cached tab counts of a section model when its rows change."""
+    if _model_is_section(sender):
+        clear_section_counts(sender)
+
+@receiver(file_changed)
+def reset_convention_imports(sender, file_path, **kwargs):
+    """Dev server: a new or edited forms/tables/filters module may change convention lookups."""
+    clear_convention_import_cache()
+    clear_section_registry(everywhere=False)
+    # Returning None lets the autoreloader restart as usual
+
+def remember_soft_delete_state(sender, instance, **kwargs):
+    """Remember the deleted_at value an instance was loaded with (post_init)."""
+    # Skip deferred loads so we never trigger a query just to track state
+    if 'deleted_at' in instance.__dict__:
+        instance._loaded_deleted_at = instance.__dict__['deleted_at']
+
+def track_soft_delete_state(model):
+    """Connect the post_init tracker to a model that has a concrete deleted_at field."""
+    if model._meta.abstract:
+        return
+    # Scan local fields only: get_field() would build the relation tree too
+    # early when called from class_prepared.
+    has_field = any(
+        field.name == 'deleted_at' and field.concrete
+        for klass in model.__mro__
+        if getattr(klass, '_meta', None) is not None and not klass._meta.abstract
+        for field in klass._meta.local_fields
+    )
+    if not has_field:
+        return
+    post_init.connect(
+        remember_soft_delete_state, sender=model, weak=False,
+        dispatch_uid='microsys_soft_delete_state',
+    )
+
+@receiver(class_prepared)
+def track_late_models(sender, **kwargs):
+    """Track models defined after app loading (e.g. test models)."""
+    # Historical models built by migrations / apps.clone() are not the project's models
+    if sender.__module__ == '__fake__' or sender._meta.apps is not apps:
+        return
+    if sender._meta.abstract or sender._meta.auto_created:
+        return
+    track_soft_delete_state(sender)
+    # A new model may be a section model or add a resolvable name
+    clear_section_registry(everywhere=False)
+    clear_model_name_index()
+
 @receiver(pre_save)
 def capture_soft_delete_state(sender, instance, **kwargs):
     """Capture state to detect soft delete in post_save."""
-    if instance.pk and hasattr(instance, 'deleted_at'):
+    if not instance._state.adding and '_loaded_deleted_at' in instance.__dict__:
+        loaded = instance._loaded_deleted_at
+        current = instance.__dict__.get('deleted_at')
+        if current is not None and current != loaded:
+            # Looks like a soft delete. The tracked value may be stale (refresh_from_db()
+            # copies deleted_at without post_init), so confirm against the stored row.
+            instance._was_not_deleted = sender._base_manager.filter(
+                pk=instance.pk, deleted_at__isnull=True
+            ).exists()
+        else:
+            instance._was_not_deleted = (loaded is None)
+    elif instance.pk and hasattr(sender, 'deleted_at'):
+        # Untracked instance (deferred deleted_at or explicit pk): read stored state
         try:
             old_instance = sender.objects.get(pk=instance.pk)
             instance._was_not_deleted = (old_instance.deleted_at is None)
@@ -72,20 +173,80 @@ EXCLUDED_MODELS = [
     'microsys.models.Profile',
 ]
 
+# update_fields that never produce an UPDATE log when they are the only ones saved
+DEFAULT_IGNORED_FIELDS = {
+    # Implicit last_login updates are handled by the user_logged_in signal
+    '*': ['last_login'],
+    'microsys.profile': ['preferences'],
+}
+
+# Per-model logging policy, compiled once in MicrosysConfig.ready():
+# { ModelClass: {'skip': bool, 'ignore_fields': frozenset, 'label': verbose_name} }
+LOGGING_POLICIES = {}
+
 def get_model_path(sender):
     """Get full model path for comparison."""
     return f"{sender.__module__}.{sender.__name__}"
 
+def _normalize_model_refs(refs):
+    """Lowercase app labels, 'app.Model' labels and module paths for matching."""
+    return {str(ref).lower() for ref in (refs or [])}
+
+def _model_refs(model):
+    """All the names a model can be referenced by in the logging settings."""
+    meta = model._meta
+    return {meta.app_label, meta.label_lower, get_model_path(model).lower()}
+
+def _compile_policy(model, config):
+    """Build the logging policy for a single model from the activity_log config."""
+    refs = _model_refs(model)
+    include = _normalize_model_refs(config.get('include'))
+    exclude = _normalize_model_refs(EXCLUDED_MODELS) | _normalize_model_refs(config.get('exclude'))
+
+    skip = (
+        model._meta.label_lower == 'microsys.useractivitylog'  # Prevent infinite recursion
+        or bool(refs & exclude)
+        or bool(include and not refs & include)
+    )
+
+    ignored = {**DEFAULT_IGNORED_FIELDS, **{
+        str(key).lower(): value for key, value in (config.get('ignore_fields') or {}).items()
+    }}
+    ignore_fields = set(ignored.get('*', []))
+    for ref in refs:
+        ignore_fields.update(ignored.get(ref, []))
+
+    return {
+        'skip': skip,
+        'ignore_fields': frozenset(ignore_fields),
+        'label': model._meta.verbose_name,
+    }
+
+def build_logging_policies():
+    """(Re)build the logging policy registry for every installed model."""
+    config = get_activity_log_config()
+    LOGGING_POLICIES.clear()
+    for model in apps.get_models(include_auto_created=True):
+        LOGGING_POLICIES[model] = _compile_policy(model, config)
+
+def get_logging_policy(sender):
+    """Return the logging policy for a model, compiling it on first use if unknown."""
+    policy = LOGGING_POLICIES.get(sender)
+    if policy is None:
+        policy = LOGGING_POLICIES[sender] = _compile_policy(sender, get_activity_log_config())
+    return policy
+
+@receiver(setting_changed)
+def reset_logging_policies(sender, setting, **kwargs):
+    """Recompile policies when the logging settings change (e.g. override_settings)."""
+    if setting == 'MICROSYS_CONFIG':
+        LOGGING_POLICIES.clear()
+
 @receiver(post_save)
 def log_save(sender, instance, created, **kwargs):
     """Log create and update actions for all models."""
-    # Prevent infinite recursion by skipping the log model itself
-    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
-    if sender == UserActivityLog:
-        return
-    
-    # Skip excluded models (like Session)
-    if get_model_path(sender) in EXCLUDED_MODELS:
+    policy = get_logging_policy(sender)
+    if policy['skip']:
         return
 
     # Skip if instance explicitly requests no logging
@@ -97,23 +258,22 @@ def log_save(sender, instance, created, **kwargs):
     if not user or not user.is_authenticated:
         return
 
-    # Ignore implicit updates to last_login (handled by user_logged_in signal)
+    # Ignore saves that only touch ignored fields (e.g. last_login, Profile preferences)
     update_fields = kwargs.get('update_fields')
-    if update_fields and 'last_login' in update_fields and len(update_fields) == 1:
+    if update_fields and policy['ignore_fields'].issuperset(update_fields):
         return
 
-    # Ignore Profile preference updates
-    if instance._meta.app_label == 'microsys' and instance._meta.object_name == 'Profile':
-        if update_fields and 'preferences' in update_fields and len(update_fields) == 1:
-            return
-
     action = "CREATE" if created else "UPDATE"
     
     # Check for soft delete transition
     if not created and getattr(instance, '_was_not_deleted', False) and getattr(instance, 'deleted_at', None):
         action = "DELETE"
 
-    model_name = instance._meta.verbose_name
+    # Inside a bulk block only the summary entry is written
+    if collect_bulk_rows(sender, action, [instance.pk]):
+        return
+
+    model_name = policy['label']
     
     # Use string representation of the object for 'number' or reference
     try:
@@ -132,7 +292,7 @@ def log_save(sender, instance, created, **kwargs):
     except (ValueError, TypeError):
         obj_id = None
 
-    UserActivityLog.objects.create(
+    write_activity_log(
         user=user,
         action=action,
         model_name=model_name,
@@ -143,15 +303,17 @@ def log_save(sender, instance, created, **kwargs):
         timestamp=now()
     )
 
+@receiver(post_save)
+def refresh_soft_delete_state(sender, instance, **kwargs):
+    """Track the saved deleted_at value so the next save compares against it."""
+    if '_loaded_deleted_at' in instance.__dict__ and 'deleted_at' in instance.__dict__:
+        instance._loaded_deleted_at = instance.__dict__['deleted_at']
+
 @receiver(post_delete)
 def log_delete(sender, instance, **kwargs):
     """Log delete actions for all models."""
-    UserActivityLog = apps.get_model('microsys', 'UserActivityLog')
-    if sender == UserActivityLog:
-        return
-    
-    # Skip excluded models (like Session)
-    if get_model_path(sender) in EXCLUDED_MODELS:
+    policy = get_logging_policy(sender)
+    if policy['skip']:
         return
 
     user = get_current_user()
@@ -159,7 +321,10 @@ def log_delete(sender, instance, **kwargs):
         return
 
     action = "DELETE"
-    model_name = instance._meta.verbose_name
+    if collect_bulk_rows(sender, action, [instance.pk]):
+        return
+
+    model_name = policy['label']
     
     try:
         obj_str = str(instance)
@@ -176,7 +341,7 @@ def log_delete(sender, instance, **kwargs):
     except (ValueError, TypeError):
         obj_id = None
 
-    UserActivityLog.objects.create(
+    write_activity_log(
         user=user,
         action=action,
         model_name=model_name,
@@ -186,3 +351,36 @@ def log_delete(sender, instance, **kwargs):
         user_agent=user_agent,
         timestamp=now()
     )
+
+def log_bulk_summaries(groups):
+    """
+    Write one activity log entry per (model, action) collected by
+    bulk_activity_log(). The 'number' column holds the row count and ids.
+    """
+    user = get_current_user()
+    if not user or not user.is_authenticated:
+        return
+
+    request = get_current_request()
+    ip = get_client_ip(request)
+    user_agent = request.META.get("HTTP_USER_AGENT", "") if request else ""
+
+    for (model, action), stats in groups.items():
+        policy = get_logging_policy(model)
+        if policy['skip'] or not stats['count']:
+            continue
+        write_activity_log(
+            user=user,
+            action=action,
+            model_name=policy['label'],
+            object_id=None,
+            number=format_bulk_ids(stats),
+            ip_address=ip,
+            user_agent=user_agent,
+            timestamp=now()
+        )
+
+@receiver(request_finished)
+def flush_buffered_logs(sender, **kwargs):
+    """Flush buffered activity logs when ActivityLogMiddleware is not installed."""
+    flush_activity_log()
@@ -361,6 +361,75 @@
                 handleInlineAdd(e, btn);
             }
         });
+
+        // Search box of large subsection lists (debounced)
+        let searchTimer = null;
+        document.body.addEventListener('input', function(e) {
+            const input = e.target.closest('.subsection-search');
+            if (!input) return;
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => searchSubsections(input), 300);
+        });
+        document.body.addEventListener('keydown', function(e) {
+            // Enter in the search box must not submit the section form
+            if (e.key === 'Enter' && e.target.closest('.subsection-search')) e.preventDefault();
+        });
+        // "More" button: next page of the current search
+        document.body.addEventListener('click', function(e) {
+            const more = e.target.closest('.subsection-search-more');
+            if (!more) return;
+            const input = more.parentElement.querySelector('.subsection-search');
+            if (input) searchSubsections(input, parseInt(more.dataset.page, 10) || 2);
+        });
+    }
+
+    function searchSubsections(input, page = 1) {
+        const term = input.value.trim();
+        const container = input.parentElement;
+        const staleMore = container.querySelector('.subsection-search-more');
+        if (staleMore) staleMore.remove();
+        if (!term) return;
+        const fieldName = input.dataset.fieldName;
+        const query = `?model=${encodeURIComponent(input.dataset.childModel)}&q=${encodeURIComponent(term)}&page=${page}`;
+
+        fetch(`${input.dataset.searchUrl}${query}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+        .then(r => r.json())
+        .then(data => {
+            if (!data.success) return;
+            // A newer search replaced this one while it was in flight
+            if (input.value.trim() !== term) return;
+            data.results.forEach(item => {
+                // Keep rows that are already rendered (and their checked state)
+                if (container.querySelector(`input.btn-check[value="${item.id}"]`)) return;
+                const checkboxId = `id_${fieldName}_found_${item.id}`;
+                const checkbox = document.createElement('input');
+                checkbox.type = 'checkbox';
+                checkbox.name = fieldName;
+                checkbox.value = item.id;
+                checkbox.className = 'btn-check';
+                checkbox.id = checkboxId;
+                const label = document.createElement('label');
+                label.className = 'btn btn-outline-secondary subsection-checkbox-label';
+                label.htmlFor = checkboxId;
+                label.style.fontSize = '1.1rem';
+                label.dataset.subId = item.id;
+                label.dataset.subName = item.text;
+                label.dataset.microContext = 'true';
+                label.dataset.locked = 'false';
+                label.textContent = item.text;
+                container.insertBefore(checkbox, input);
+                container.insertBefore(label, input);
+            });
+            if (data.has_more) {
+                const more = document.createElement('button');
+                more.type = 'button';
+                more.className = 'btn btn-outline-secondary subsection-search-more';
+                more.dataset.page = page + 1;
+                more.textContent = 'المزيد';
+                container.insertBefore(more, input.nextSibling);
+            }
+        })
+        .catch(err => console.error(err));
     }
 
     // Ported Logic for Subsection Inline Edit
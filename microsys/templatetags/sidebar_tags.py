@@ -16,17 +16,21 @@ def auto_sidebar(context):
     Render auto-discovered sidebar items.
     
     Uses items from sidebar_auto_items context variable (provided by
-    the context processor) and adds resolved URLs and active state.
+    the context processor, with URLs and active state already resolved).
+    Items missing a URL are resolved here.
     
     Usage:
         {% load sidebar_tags %}
         {% auto_sidebar %}
     """
     request = context.get('request')
-    items = list(context.get('sidebar_auto_items', []))
+    items = []
     
-    # Add resolved URLs and active state
-    for item in items:
+    for item in context.get('sidebar_auto_items', []):
+        if 'url' in item and 'active' in item:
+            items.append(item)
+            continue
+        item = dict(item)
         try:
             item['url'] = reverse(item['url_name'])
             # Check if current path matches or starts with this URL
@@ -34,6 +38,7 @@ def auto_sidebar(context):
         except NoReverseMatch:
             item['url'] = '#'
             item['active'] = False
+        items.append(item)
     
     return {'items': items, 'request': request}
 
@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from microsys import middleware
+from microsys.activity import buffered_activity_log, bulk_activity_log, flush_activity_log, format_bulk_ids
+from microsys.models import Profile, Scope, ScopeSettings, UserActivityLog
+
+
+def _log_inserts(queries):
+    table = UserActivityLog._meta.db_table
+    return [q for q in queries if q["sql"].startswith(f'INSERT INTO "{table}"')]
+
+
+class BufferedActivityLogTests(TestCase):
+    def setUp(self):
+        ScopeSettings.load()
+        self.user = get_user_model().objects.create_user(username="writer", password="x")
+        self.addCleanup(middleware.reset_current_user, middleware.set_current_user(self.user))
+
+    def _scope_logs(self):
+        return UserActivityLog.all_objects.filter(action="CREATE", model_name=Scope._meta.verbose_name)
+
+    def test_unbuffered_writes_one_insert_per_save(self):
+        with CaptureQueriesContext(connection) as ctx:
+            for i in range(3):
+                Scope.objects.create(name=f"scope {i}")
+        self.assertEqual(len(_log_inserts(ctx.captured_queries)), 3)
+        self.assertEqual(self._scope_logs().count(), 3)
+
+    def test_buffered_block_flushes_with_single_bulk_create(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with buffered_activity_log():
+                for i in range(3):
+                    Scope.objects.create(name=f"scope {i}")
+                self.assertEqual(self._scope_logs().count(), 0)
+        self.assertEqual(len(_log_inserts(ctx.captured_queries)), 1)
+        self.assertEqual(self._scope_logs().count(), 3)
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"buffered": True, "buffer_size": 2}})
+    def test_buffer_flushes_when_size_threshold_is_hit(self):
+        for i in range(3):
+            Scope.objects.create(name=f"scope {i}")
+        self.assertEqual(self._scope_logs().count(), 2)
+
+        self.assertEqual(flush_activity_log(), 1)
+        self.assertEqual(self._scope_logs().count(), 3)
+
+
+class BulkActivityLogTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="bulk", password="x")
+        self.addCleanup(middleware.reset_current_user, middleware.set_current_user(self.user))
+
+    def test_queryset_delete_writes_single_summary(self):
+        User = get_user_model()
+        with bulk_activity_log():
+            for i in range(12):
+                User.objects.create_user(username=f"member{i}", password="x")
+            User.objects.exclude(pk=self.user.pk).delete()
+
+        user_label = User._meta.verbose_name
+        deletes = UserActivityLog.all_objects.filter(action="DELETE", model_name=user_label)
+        self.assertEqual(deletes.count(), 1)
+        self.assertTrue(deletes.get().number.startswith("12: "))
+        self.assertEqual(UserActivityLog.all_objects.filter(action="CREATE", model_name=user_label).count(), 1)
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"bulk_summary": True}})
+    def test_scoped_queryset_update_is_summarized(self):
+        User = get_user_model()
+        for i in range(12):
+            User.objects.create_user(username=f"member{i}", password="x")
+        policy = {"skip": False, "ignore_fields": frozenset(), "label": "profile"}
+        with mock.patch.dict("microsys.signals.LOGGING_POLICIES", {Profile: policy}), \
+                mock.patch("microsys.signals.log_bulk_summaries") as log_summaries:
+            with self.assertNumQueries(3):  # aggregate, pk sample, UPDATE
+                updated = Profile.objects.all().update(phone="0910000000")
+
+        self.assertEqual(updated, 13)
+        log_summaries.assert_called_once()
+        (groups,), _ = log_summaries.call_args
+        stats = groups[(Profile, "UPDATE")]
+        self.assertEqual(stats["count"], 13)
+        self.assertEqual(len(stats["ids"]), 11)
+        self.assertEqual(format_bulk_ids(stats), f"13: {stats['first']}-{stats['last']}")
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"bulk_summary": True}})
+    def test_update_of_skipped_model_reads_no_pks(self):
+        with mock.patch("microsys.signals.log_bulk_summaries") as log_summaries:
+            with self.assertNumQueries(1):
+                updated = Profile.objects.all().update(phone="0910000000")
+
+        self.assertEqual(updated, 1)
+        log_summaries.assert_not_called()
+
+    def test_format_bulk_ids(self):
+        self.assertEqual(format_bulk_ids({"count": 3, "first": 4, "last": 9, "ids": [9, 4, 7]}), "3: 4, 7, 9")
+        self.assertEqual(format_bulk_ids({"count": 120, "first": 5, "last": 130, "ids": list(range(11))}), "120: 5-130")
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.db import models
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import isolate_apps
+
+from microsys import discovery, utils
+from microsys.models import Scope as ScopeModel, ScopeSettings, UserActivityLog
+
+
+class FindModelTests(SimpleTestCase):
+    def setUp(self):
+        self.config = discovery.get_sidebar_config()
+        self.index = discovery._build_model_index(self.config)
+
+    def test_plural_and_snake_case_hints(self):
+        self.assertIs(discovery._find_model("useractivitylogs", self.config, self.index), UserActivityLog)
+        self.assertIs(discovery._find_model("user_activity_logs", self.config, self.index), UserActivityLog)
+        self.assertIs(discovery._find_model("scope-settings", self.config, self.index), ScopeSettings)
+
+    def test_fuzzy_match_is_memoized(self):
+        with mock.patch.object(discovery, "get_close_matches", wraps=discovery.get_close_matches) as fuzzy:
+            for _ in range(5):
+                self.assertIs(discovery._find_model("useractivitylog_x", self.config, self.index), UserActivityLog)
+        self.assertEqual(fuzzy.call_count, 1)
+
+    @override_settings(SIDEBAR_AUTO={"URL_PATTERNS": ["manage", "delete"], "EXCLUDE_APPS": []})
+    def test_discovery_builds_index_once(self):
+        with mock.patch.object(discovery, "_build_model_index", wraps=discovery._build_model_index) as build:
+            items = discovery.discover_list_urls()
+        self.assertEqual(build.call_count, 1)
+        self.assertIn("section", {item["model_name"] for item in items})
+
+
+class ResolveModelByNameTests(SimpleTestCase):
+    def setUp(self):
+        utils.clear_model_name_index()
+        self.addCleanup(utils.clear_model_name_index)
+
+    def test_index_is_built_once(self):
+        self.assertIs(utils.resolve_model_by_name("UserActivityLog"), UserActivityLog)
+        with mock.patch.object(utils.apps, "get_models") as get_models:
+            self.assertIs(utils.resolve_model_by_name("scopesettings"), ScopeSettings)
+            self.assertIsNone(utils.resolve_model_by_name("nothing"))
+        get_models.assert_not_called()
+
+    @isolate_apps("tests")
+    def test_ambiguous_name_keeps_first_match_and_warns(self):
+        class Scope(models.Model):
+            class Meta:
+                app_label = "tests"
+
+        with mock.patch.object(utils.apps, "get_models", return_value=[ScopeModel, Scope]):
+            with self.assertWarnsRegex(RuntimeWarning, "ambiguous"):
+                self.assertIs(utils.resolve_model_by_name("scope"), ScopeModel)
+            self.assertIs(utils.resolve_model_by_name("scope", app_label="microsys"), ScopeModel)
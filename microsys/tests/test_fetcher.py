@@ -0,0 +1,268 @@
+import datetime
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from microsys import fetcher
+from microsys.models import Scope, UserActivityLog
+
+
+class FetcherTestMixin:
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = FileSystemStorage(location=self.root)
+        self.field = models.FileField(storage=self.storage)
+
+    def _file_info(self, name, content, number=1):
+        saved = self.storage.save(name, ContentFile(content))
+        return {
+            "model_name": "Decree",
+            "number": number,
+            "date": "2024-01-01",
+            "file": FieldFile(None, self.field, saved),
+        }
+
+
+class ServeSingleFileTests(FetcherTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = bytes(range(256)) * 1024  # 256 KB
+        self.info = self._file_info("scan.pdf", self.content)
+
+    def _get(self, **headers):
+        return fetcher.serve_single_file(self.info, RequestFactory().get("/", **headers))
+
+    def test_streams_whole_file_with_validators(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        self.assertIn('filename="Decree_1_2024-01-01.pdf"', response["Content-Disposition"])
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["ETag"] and response["Last-Modified"])
+        response.close()
+
+    def test_conditional_request_gets_304(self):
+        full = self._get()
+        full.close()
+        response = self._get(HTTP_IF_NONE_MATCH=full["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], full["ETag"])
+        self.assertEqual(response["Last-Modified"], full["Last-Modified"])
+
+    def test_byte_ranges(self):
+        response = self._get(HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(b"".join(response.streaming_content), self.content[100:200])
+
+        suffix = self._get(HTTP_RANGE="bytes=-10")
+        self.assertEqual(b"".join(suffix.streaming_content), self.content[-10:])
+
+        self.assertEqual(self._get(HTTP_RANGE=f"bytes={len(self.content)}-").status_code, 416)
+
+    def test_invalid_range_sends_whole_file(self):
+        response = self._get(HTTP_RANGE="bytes=500-100")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(self.content)))
+        response.close()
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self._get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+
+class ServeZipFileTests(FetcherTestMixin, TestCase):
+    def test_streams_archive_members_in_chunks(self):
+        pdf = bytes(range(256)) * 1024
+        text = b"plain text " * 20000
+        files = [
+            self._file_info("a.pdf", pdf, number=3),
+            self._file_info("b.txt", text, number=7),
+        ]
+        response = fetcher.serve_zip_file(files)
+        self.assertTrue(response.streaming)
+        self.assertIn("Decree_3-7.zip", response["Content-Disposition"])
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 4)
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            pdf_info = archive.getinfo("Decree_3_2024-01-01.pdf")
+            txt_info = archive.getinfo("Decree_7_2024-01-01.txt")
+            self.assertEqual(pdf_info.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(txt_info.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(archive.read(pdf_info), pdf)
+            self.assertEqual(archive.read(txt_info), text)
+
+    def test_missing_member_is_skipped(self):
+        files = [self._file_info("a.pdf", b"%PDF", number=1), self._file_info("b.pdf", b"%PDF", number=2)]
+        self.storage.delete(files[1]["file"].name)
+        payload = b"".join(fetcher.serve_zip_file(files).streaming_content)
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            self.assertEqual(archive.namelist(), ["Decree_1_2024-01-01.pdf"])
+
+    def test_unknown_size_member_uses_zip64(self):
+        class RemoteFile:
+            name = "remote.bin"
+
+            @property
+            def size(self):
+                raise NotImplementedError
+
+            def open(self, mode="rb"):
+                return io.BytesIO(b"x" * 1000)
+
+        payload = b"".join(fetcher._iter_zip([("remote.bin", RemoteFile())]))
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            self.assertEqual(archive.read("remote.bin"), b"x" * 1000)
+
+
+class SlowFile:
+    """Stands in for a FieldFile on remote storage."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, size, delay):
+        self.name, self.size, self.delay = name, size, delay
+
+    def open(self, mode="rb"):
+        with SlowFile.lock:
+            SlowFile.active += 1
+            SlowFile.peak = max(SlowFile.peak, SlowFile.active)
+        time.sleep(self.delay)
+        with SlowFile.lock:
+            SlowFile.active -= 1
+        return io.BytesIO(self.name.encode() * (self.size // len(self.name)))
+
+
+class PrefetchMembersTests(SimpleTestCase):
+    def setUp(self):
+        SlowFile.active = SlowFile.peak = 0
+
+    def _members(self, count=8, size=1000):
+        # Later members finish first
+        return [(f"m{i}", SlowFile(f"m{i}", size, 0.02 * (count - i))) for i in range(count)]
+
+    def test_order_is_kept_and_reads_overlap(self):
+        members = self._members()
+        start = time.perf_counter()
+        names = [name for name, _, data in fetcher._prefetch_members(members, workers=4, max_bytes=10**6)]
+        elapsed = time.perf_counter() - start
+        self.assertEqual(names, [name for name, _ in members])
+        self.assertEqual(SlowFile.peak, 4)
+        self.assertLess(elapsed, sum(f.delay for _, f in members) * 0.75)
+
+    def test_memory_cap_limits_reads_in_flight(self):
+        results = list(fetcher._prefetch_members(self._members(size=1000), workers=4, max_bytes=2000))
+        self.assertEqual(SlowFile.peak, 2)
+        self.assertTrue(all(data for _, _, data in results))
+
+    def test_large_or_unprefetched_members_are_streamed_by_caller(self):
+        members = self._members(count=3, size=5000)
+        self.assertEqual([data for _, _, data in fetcher._prefetch_members(members, workers=4, max_bytes=1000)], [None] * 3)
+        self.assertEqual([data for _, _, data in fetcher._prefetch_members(members, workers=0)], [None] * 3)
+        self.assertEqual(SlowFile.peak, 0)
+
+
+class ExportToExcelTests(TestCase):
+    def setUp(self):
+        self.scope = Scope.objects.create(name="North")
+        self.user = get_user_model().objects.create_user(username="exporter", password="x")
+        for i in range(5):
+            UserActivityLog.objects.create(
+                user=self.user, action="EXPORT", number=str(i + 1), object_id=i, scope=self.scope
+            )
+        self.request = RequestFactory().get("/")
+
+    def _rows(self, response):
+        content = b"".join(response.streaming_content)
+        response.close()
+        sheet = openpyxl.load_workbook(io.BytesIO(content)).active
+        return [list(row) for row in sheet.iter_rows(values_only=True)]
+
+    def test_database_columns_come_from_one_values_query(self):
+        headers = [("Number", "number"), ("ID", "object_id"), ("Scope", "scope"), ("Time", "timestamp")]
+        queryset = UserActivityLog.objects.order_by("pk")
+        with self.assertNumQueries(1):  # Filename numbers are taken from the same pass
+            response = fetcher.export_to_excel(self.request, queryset, headers, sheet_title="Log")
+        self.assertIn('filename="1-5.xlsx"', response["Content-Disposition"])
+        rows = self._rows(response)
+        self.assertEqual(rows[0], ["Number", "ID", "Scope", "Time"])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][:3], ["1", 0, "North"])
+        self.assertIsInstance(rows[1][3], datetime.datetime)
+
+    def test_filename_numbers_without_number_column(self):
+        headers = [("Action", "action")]
+        queryset = UserActivityLog.objects.order_by("-pk")
+        with self.assertNumQueries(1):
+            response = fetcher.export_to_excel(self.request, queryset, headers)
+        self.assertIn('filename="5-1.xlsx"', response["Content-Disposition"])
+        response.close()
+
+    def test_instance_columns_use_select_related(self):
+        headers = [("User", "user"), ("Action", "action")]
+        with self.assertNumQueries(1):
+            rows = list(fetcher.iter_export_rows(UserActivityLog.objects.order_by("pk"), headers))
+        self.assertEqual(rows[0], ("exporter", "EXPORT"))
+
+
+class StreamingExportTests(TestCase):
+    headers = [("رقم", "number"), ("المستخدم", "user"), ("النطاق", "scope")]
+
+    def setUp(self):
+        scope = Scope.objects.create(name="الشمال")
+        user = get_user_model().objects.create_user(username="streamer", password="x")
+        for i in range(3):
+            UserActivityLog.objects.create(user=user, action="VIEW", number=str(i + 1), scope=scope)
+        self.queryset = UserActivityLog.objects.order_by("pk")
+        self.request = RequestFactory().get("/")
+
+    def test_csv_has_bom_and_one_line_per_record(self):
+        response = fetcher.export_to_csv(self.request, self.queryset, self.headers)
+        self.assertTrue(response.streaming)
+        self.assertIn('filename="1-3.csv"', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(content.startswith("﻿رقم,المستخدم,النطاق"))
+        self.assertEqual(content.splitlines()[1:], ["1,streamer,الشمال", "2,streamer,الشمال", "3,streamer,الشمال"])
+
+    def test_filename_needs_one_aggregate_only_with_number_field(self):
+        with self.assertNumQueries(2):  # Min/Max, rows
+            response = fetcher.export_to_csv(self.request, self.queryset, self.headers)
+            b"".join(response.streaming_content)
+        with self.assertNumQueries(1):
+            response = fetcher.export_to_csv(self.request, Scope.objects.all(), [("Name", "name")])
+            b"".join(response.streaming_content)
+        self.assertIn('filename="0-0.csv"', response["Content-Disposition"])
+
+    def test_ndjson_objects_are_keyed_by_attribute(self):
+        response = fetcher.export_to_ndjson(self.request, self.queryset, self.headers)
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0]), {"number": "1", "user": "streamer", "scope": "الشمال"})
+        self.assertEqual(len(lines), 3)
+
+    def test_ndjson_keeps_missing_values_as_null(self):
+        UserActivityLog.objects.update(object_id=None)
+        headers = [("ID", "object_id"), ("Number", "number")]
+        response = fetcher.export_to_ndjson(self.request, self.queryset, headers)
+        first = json.loads(b"".join(response.streaming_content).decode("utf-8").splitlines()[0])
+        self.assertEqual(first, {"object_id": None, "number": "1"})
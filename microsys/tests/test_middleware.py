@@ -0,0 +1,50 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from microsys.middleware import ActivityLogMiddleware, get_current_request, get_current_user
+
+
+class ActivityLogMiddlewareTests(SimpleTestCase):
+    def _request(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_sync_request_binds_and_clears_context(self):
+        seen = {}
+
+        def get_response(request):
+            seen["user"] = get_current_user()
+            seen["request"] = get_current_request()
+            return HttpResponse()
+
+        request = self._request("alice")
+        ActivityLogMiddleware(get_response)(request)
+
+        self.assertEqual(seen, {"user": "alice", "request": request})
+        self.assertIsNone(get_current_user())
+        self.assertIsNone(get_current_request())
+
+    def test_async_requests_do_not_share_context(self):
+        seen = []
+
+        async def get_response(request):
+            await asyncio.sleep(0.01)
+            seen.append((request.user, get_current_user()))
+            return HttpResponse()
+
+        middleware = ActivityLogMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+
+        async def run_concurrently():
+            await asyncio.gather(*(middleware(self._request(name)) for name in ("alice", "bob", "carol")))
+
+        async_to_sync(run_concurrently)()
+
+        self.assertEqual(len(seen), 3)
+        for expected, actual in seen:
+            self.assertEqual(expected, actual)
+        self.assertIsNone(get_current_user())
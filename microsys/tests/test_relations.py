@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, models
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import isolate_apps
+from django.utils import timezone
+
+from microsys.managers import ScopedManager
+from microsys.models import Profile, Scope, UserActivityLog
+from microsys.utils import (
+    collect_related_objects, get_relation_plan, has_related_records, locked_related_ids,
+)
+
+
+class LockedRelatedIdsTests(TestCase):
+    def setUp(self):
+        self.scopes = [Scope.objects.create(name=name) for name in ("A", "B", "C", "D")]
+        User = get_user_model()
+        active = Profile.all_objects.get(user=User.objects.create_user(username="active", password="x"))
+        active.scope = self.scopes[0]
+        active.save()
+        removed = Profile.all_objects.get(user=User.objects.create_user(username="removed", password="x"))
+        removed.scope = self.scopes[1]
+        removed.deleted_at = timezone.now()
+        removed.save()
+        UserActivityLog.objects.create(action="VIEW", scope=self.scopes[2])
+
+    def test_matches_has_related_records_with_one_query_per_relation(self):
+        pks = [scope.pk for scope in self.scopes]
+        with self.assertNumQueries(2):  # profile_set, useractivitylog_set
+            locked = locked_related_ids(Scope, pks)
+        expected = {scope.pk for scope in self.scopes if has_related_records(scope)}
+        self.assertEqual(locked, expected)
+        self.assertEqual(locked, {self.scopes[0].pk, self.scopes[2].pk})
+
+    def test_ignored_relations_and_empty_input(self):
+        pks = [scope.pk for scope in self.scopes]
+        self.assertEqual(locked_related_ids(Scope, pks, ignore_relations=["useractivitylog_set"]), {self.scopes[0].pk})
+        with self.assertNumQueries(0):
+            self.assertEqual(locked_related_ids(Scope, []), set())
+
+
+class RelationPlanTests(TestCase):
+    def test_plan_is_built_once_per_model(self):
+        plan = get_relation_plan(Scope)
+        self.assertIs(get_relation_plan(Scope), plan)
+        self.assertEqual(
+            {rel["accessor"] for rel in plan["lock_relations"]},
+            {"profile_set", "useractivitylog_set"},
+        )
+
+    def test_helpers_skip_field_introspection_when_warm(self):
+        scope = Scope.objects.create(name="Warm")
+        get_relation_plan(Scope)
+        with mock.patch.object(Scope._meta, "get_fields") as get_fields:
+            self.assertFalse(has_related_records(scope))
+            self.assertEqual(collect_related_objects(scope), {})
+            locked_related_ids(Scope, [scope.pk])
+        get_fields.assert_not_called()
+
+
+class RelatedPreviewTests(TestCase):
+    def setUp(self):
+        self.scope = Scope.objects.create(name="Hub")
+        User = get_user_model()
+        for username in ("p1", "p2", "p3"):
+            profile = Profile.all_objects.get(user=User.objects.create_user(username=username, password="x"))
+            profile.scope = self.scope
+            profile.save()
+        UserActivityLog.objects.bulk_create(
+            [UserActivityLog(action="VIEW", scope=self.scope) for _ in range(25)]
+        )
+
+    def test_counts_in_one_query_and_truncates(self):
+        with self.settings(MICROSYS_CONFIG={"related_preview_items": 5}):
+            with self.assertNumQueries(3):  # counts, profiles, activity logs
+                preview = collect_related_objects(self.scope, preview=True)
+        self.assertEqual(set(preview), set(collect_related_objects(self.scope)))
+        logs = preview[UserActivityLog._meta.verbose_name_plural]
+        self.assertEqual(len(logs), 6)
+        self.assertEqual(logs[-1], "… +20")
+        self.assertEqual(len(preview[Profile._meta.verbose_name_plural]), 3)
+
+    def test_relation_budget_reports_counts_only(self):
+        with self.settings(MICROSYS_CONFIG={"related_preview_relations": 1}):
+            with self.assertNumQueries(2):
+                preview = collect_related_objects(self.scope, preview=True)
+        self.assertEqual(sorted(len(items) for items in preview.values()), [1, 3])
+        self.assertIn("… +25", preview[UserActivityLog._meta.verbose_name_plural])
+
+    def test_empty_relations_are_skipped(self):
+        leaf = Scope.objects.create(name="Leaf")
+        with self.assertNumQueries(1):
+            self.assertEqual(collect_related_objects(leaf, preview=True), {})
+
+
+@isolate_apps("tests")
+class RelatedPreviewManyToManyTests(TransactionTestCase):
+    def setUp(self):
+        class Tag(models.Model):
+            name = models.CharField(max_length=20)
+            deleted_at = models.DateTimeField(null=True, blank=True)
+            objects = ScopedManager()
+            all_objects = models.Manager()
+
+            class Meta:
+                app_label = "tests"
+
+        class Article(models.Model):
+            title = models.CharField(max_length=20)
+            tags = models.ManyToManyField(Tag, related_name="articles")
+            deleted_at = models.DateTimeField(null=True, blank=True)
+            objects = ScopedManager()
+            all_objects = models.Manager()
+
+            class Meta:
+                app_label = "tests"
+
+        with connection.schema_editor() as editor:
+            editor.create_model(Tag)
+            editor.create_model(Article)
+        self.addCleanup(self._drop, Tag, Article)
+
+        self.article = Article.objects.create(title="Post")
+        tags = [Tag.objects.create(name=f"t{n}") for n in range(3)]
+        self.article.tags.set(tags)
+        tags[0].deleted_at = timezone.now()
+        tags[0].save()
+        self.tag = tags[1]
+        draft = Article.objects.create(title="Draft", deleted_at=timezone.now())
+        draft.tags.add(self.tag)
+
+    @staticmethod
+    def _drop(*models_):
+        with connection.schema_editor() as editor:
+            for model in models_:
+                editor.delete_model(model)
+
+    def test_soft_deleted_targets_are_not_counted(self):
+        with self.settings(MICROSYS_CONFIG={"related_preview_items": 1}):
+            preview = collect_related_objects(self.article, preview=True)
+        self.assertEqual(list(preview.values()), [["t1", "… +1"]])
+
+    def test_reverse_many_to_many_skips_soft_deleted_rows(self):
+        preview = collect_related_objects(self.tag, preview=True)
+        self.assertEqual(list(preview.values()), [["Post"]])
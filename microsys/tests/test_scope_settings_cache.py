@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from microsys import middleware
+from microsys.models import ScopeSettings
+from microsys.utils import is_scope_enabled
+
+
+class ScopeSettingsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_lookup_is_cached_across_calls(self):
+        ScopeSettings.load()
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertFalse(is_scope_enabled())
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                self.assertFalse(is_scope_enabled())
+
+    def test_request_memo_skips_cache(self):
+        request = RequestFactory().get("/")
+        self.addCleanup(middleware._current_request.reset, middleware._current_request.set(request))
+
+        self.assertFalse(is_scope_enabled())
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertFalse(is_scope_enabled())
+
+    def test_save_refreshes_cached_flag(self):
+        self.assertFalse(is_scope_enabled())
+        settings_obj = ScopeSettings.load()
+        settings_obj.is_enabled = True
+        settings_obj.save()
+        with self.assertNumQueries(0):
+            self.assertTrue(is_scope_enabled())
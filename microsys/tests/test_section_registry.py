@@ -0,0 +1,175 @@
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import isolate_apps
+from django.utils.autoreload import file_changed
+
+from microsys import utils
+from microsys.models import Profile, Scope
+from microsys.utils import (
+    SectionCounts, clear_convention_import_cache, clear_section_registry, discover_section_models,
+)
+
+
+class SectionRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_section_registry()
+        self.addCleanup(clear_section_registry)
+        self.addCleanup(cache.clear)
+        for model in (Scope, Profile):
+            patcher = mock.patch.object(model, "is_section", True, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_warm_lookup_skips_discovery(self):
+        cold = discover_section_models(app_name="microsys")
+        self.assertEqual({sm["model"] for sm in cold}, {Scope, Profile})
+
+        with mock.patch.object(utils, "import_string") as import_string, \
+                mock.patch.object(utils, "modelform_factory") as form_factory:
+            for _ in range(20):
+                warm = discover_section_models(app_name="microsys")
+        import_string.assert_not_called()
+        form_factory.assert_not_called()
+
+        self.assertIs(warm[0]["form_class"], cold[0]["form_class"])
+
+    def test_clear_invalidates_other_processes(self):
+        first = discover_section_models(app_name="microsys")
+        # Another process bumps the shared generation
+        utils.bump_cache_generation(utils.SECTION_GENERATION_KEY)
+        second = discover_section_models(app_name="microsys")
+        self.assertIsNot(second[0]["form_class"], first[0]["form_class"])
+
+    def _by_model(self, section_models):
+        return {sm["model"]: sm for sm in section_models}
+
+    def test_registry_is_keyed_by_scope_flag(self):
+        disabled = self._by_model(discover_section_models(app_name="microsys"))
+        with mock.patch.object(utils, "is_scope_enabled", return_value=True):
+            enabled = self._by_model(discover_section_models(app_name="microsys"))
+        # Only models with a scope field get scope-specific classes
+        self.assertIsNot(enabled[Profile]["form_class"], disabled[Profile]["form_class"])
+        self.assertIs(enabled[Scope]["form_class"], disabled[Scope]["form_class"])
+
+    def test_unscoped_lookups_do_not_read_the_scope_flag(self):
+        with mock.patch.object(utils, "is_scope_enabled") as is_scope_enabled:
+            self.assertEqual(discover_section_models(app_name="missing_app"), [])
+            self.assertEqual(discover_section_models(app_name="missing_app"), [])
+        is_scope_enabled.assert_not_called()
+
+    def test_unreachable_scope_settings_count_as_disabled(self):
+        with mock.patch.object(utils, "is_scope_enabled", side_effect=Exception("no database")):
+            section_models = self._by_model(discover_section_models(app_name="microsys"))
+        self.assertIn("scope", section_models[Profile]["table_class"]._meta.exclude)
+
+    @isolate_apps("tests")
+    def test_historical_models_keep_the_registry(self):
+        discover_section_models(app_name="microsys")
+        with mock.patch.object(utils, "_discover_section_models", wraps=utils._discover_section_models) as discover:
+            # What the migration executor builds: models in a separate app registry
+            type("Document", (models.Model,), {
+                "__module__": "__fake__",
+                "Meta": type("Meta", (), {"app_label": "tests"}),
+            })
+            discover_section_models(app_name="microsys")
+        discover.assert_not_called()
+
+
+class ConventionImportCacheTests(TestCase):
+    def setUp(self):
+        clear_convention_import_cache()
+        self.addCleanup(clear_convention_import_cache)
+
+    def test_hits_and_misses_are_cached(self):
+        from microsys.tables import ScopeTable
+
+        self.assertIs(utils._import_by_convention(Scope, "tables", "Table"), ScopeTable)
+        self.assertIsNone(utils._import_by_convention(Scope, "missing", "Thing"))
+        with mock.patch.object(utils, "import_string") as import_string:
+            self.assertIs(utils._import_by_convention(Scope, "tables", "Table"), ScopeTable)
+            self.assertIsNone(utils._import_by_convention(Scope, "missing", "Thing"))
+        import_string.assert_not_called()
+
+    def test_autoreload_file_change_resets_cache(self):
+        utils._import_by_convention(Scope, "missing", "Thing")
+        file_changed.send(sender=None, file_path=Path("app/forms.py"))
+        with mock.patch.object(utils, "import_string", side_effect=ImportError) as import_string:
+            utils._import_by_convention(Scope, "missing", "Thing")
+        self.assertTrue(import_string.called)
+
+
+class GeneratedClassMemoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(utils.clear_generated_classes)
+
+    def test_classes_are_reused_per_model(self):
+        self.assertIs(utils.resolve_form_class_for_model(Scope), utils.resolve_form_class_for_model(Scope))
+        self.assertIs(utils._build_generic_table_class(Profile), utils._build_generic_table_class(Profile))
+        self.assertIs(utils._build_generic_filter_class(Profile), utils._build_generic_filter_class(Profile))
+
+    def test_scope_state_gets_its_own_classes(self):
+        disabled = utils._build_generic_table_class(Profile)
+        with mock.patch.object(utils, "is_scope_enabled", return_value=True):
+            enabled = utils._build_generic_table_class(Profile)
+        self.assertIsNot(enabled, disabled)
+        self.assertIn("scope", disabled._meta.exclude)
+        self.assertNotIn("scope", enabled._meta.exclude)
+
+    @isolate_apps("tests")
+    def test_memo_lives_on_the_model_class(self):
+        class Memo(models.Model):
+            title = models.CharField(max_length=20)
+
+            class Meta:
+                app_label = "tests"
+
+        form_class = utils.resolve_form_class_for_model(Memo)
+        self.assertIs(Memo.__dict__[utils.MODEL_MEMO_ATTR][("form", False)], form_class)
+
+
+class SectionCountsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for model in (Scope, Profile):
+            patcher = mock.patch.object(model, "is_section", True, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        Scope.objects.create(name="North")
+        Scope.objects.create(name="South")
+        get_user_model().objects.create_user(username="counted", password="x")
+        self.assertFalse(utils.is_scope_enabled())  # Warm the scope flag cache
+        self.sections = [
+            {"model_name": "scope", "model": Scope},
+            {"model_name": "profile", "model": Profile},
+        ]
+
+    def test_lazy_counts_only_run_when_read(self):
+        counts = SectionCounts(self.sections)
+        with self.assertNumQueries(0):
+            lazy_scope = counts.lazy("scope")
+            counts.lazy("profile")
+        with self.assertNumQueries(1):
+            self.assertEqual(Template("{{ n }}").render(Context({"n": lazy_scope})), "2")
+
+    def test_all_counts_in_one_query_and_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(SectionCounts(self.sections).all(), {"scope": 2, "profile": 1})
+        with self.assertNumQueries(0):
+            self.assertEqual(SectionCounts(self.sections).all(), {"scope": 2, "profile": 1})
+
+    def test_save_refreshes_cached_count(self):
+        SectionCounts(self.sections).all()
+        Scope.objects.create(name="East")
+        self.assertEqual(SectionCounts(self.sections)["scope"], 3)
+        Scope.objects.filter(name="East").first().delete()
+        self.assertEqual(SectionCounts(self.sections)["scope"], 2)
@@ -0,0 +1,159 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import RequestContext, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from microsys import context_processors
+from microsys.context_processors import microsys_context
+
+URL_NAMES = ["manage_users", "user_activity_log", "options_view", "manage_sections", "manage_scopes"]
+
+# 60 extra sidebar items spread over 6 groups
+EXTRA_ITEMS = {
+    f"group_{g}": {
+        "icon": "bi-folder",
+        "items": [
+            {
+                "url_name": URL_NAMES[i % len(URL_NAMES)],
+                "label": f"Item {g}-{i}",
+                "permission": "microsys.view_activity_log" if i % 2 else None,
+            }
+            for i in range(10)
+        ],
+    }
+    for g in range(6)
+}
+
+
+@override_settings(SIDEBAR_AUTO={"EXTRA_ITEMS": EXTRA_ITEMS})
+class SidebarCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="admin", password="x")
+        self.staff = User.objects.create_user(username="staff", password="x", is_staff=True)
+
+    def _request(self, user, path="/sys/sys/users/"):
+        request = RequestFactory().get(path)
+        request.user = user
+        request.session = SessionBase()
+        return request
+
+    def _items(self, context):
+        return [item for group in context["sidebar_extra_groups"].values() for item in group["items"]]
+
+    def test_warm_render_does_not_reverse(self):
+        cold = microsys_context(self._request(self.admin))
+        self.assertGreaterEqual(len(self._items(cold)), 50)
+
+        with mock.patch.object(context_processors, "reverse", wraps=context_processors.reverse) as reverse:
+            for _ in range(20):
+                warm = microsys_context(self._request(self.admin))
+        self.assertEqual(reverse.call_count, 0)
+
+        self.assertEqual(self._items(warm), self._items(cold))
+
+    def test_active_flag_is_per_request(self):
+        microsys_context(self._request(self.admin))
+        context = microsys_context(self._request(self.admin, path="/sys/sys/options/"))
+        active = {item["url_name"] for item in self._items(context) if item["active"]}
+        self.assertEqual(active, {"options_view"})
+
+    def test_permission_sets_get_separate_entries(self):
+        admin_items = self._items(microsys_context(self._request(self.admin)))
+        staff_items = self._items(microsys_context(self._request(self.staff)))
+        self.assertGreater(len(admin_items), len(staff_items))
+        self.assertIn("Item 0-0", {item["label"] for item in staff_items})
+        self.assertNotIn("Item 0-1", {item["label"] for item in staff_items})
+
+    def test_superusers_differing_in_is_staff_get_separate_entries(self):
+        extra = {"Staff": {"items": [{"url_name": "options_view", "label": "Staff only", "permission": "is_staff"}]}}
+        User = get_user_model()
+        staff_su = User.objects.create_superuser(username="staff_su", password="x")
+        plain_su = User.objects.create_user(username="plain_su", password="x", is_superuser=True)
+        with override_settings(SIDEBAR_AUTO={"EXTRA_ITEMS": extra}):
+            self.assertIn("Staff only", {item["label"] for item in self._items(microsys_context(self._request(staff_su)))})
+            self.assertNotIn("Staff only", {item["label"] for item in self._items(microsys_context(self._request(plain_su)))})
+
+
+class LazyContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_superuser(username="lazy", password="x")
+
+    def _request(self):
+        request = RequestFactory().get("/sys/sys/")
+        request.user = get_user_model().objects.get(pk=self.user.pk)
+        request.session = SessionBase()
+        return request
+
+    def test_unused_values_cost_nothing(self):
+        request = self._request()
+        with mock.patch.object(context_processors, "discover_list_urls") as discover:
+            with self.assertNumQueries(0):
+                html = Template("<td>{{ row }}</td>").render(RequestContext(request, {"row": 1}))
+        self.assertEqual(html, "<td>1</td>")
+        discover.assert_not_called()
+
+    def test_values_resolve_in_templates(self):
+        template = Template(
+            "{{ user_preferences|json_script:'prefs' }}"
+            "{% if CURRENT_LANG == 'ar' %}ar{% endif %}{{ scope_settings.is_enabled }}"
+        )
+        html = template.render(RequestContext(self._request()))
+        self.assertIn('<script id="prefs" type="application/json">{}</script>', html)
+        self.assertTrue(html.endswith("arFalse"))
+
+    def test_state_is_shared_per_request(self):
+        request = self._request()
+        str(microsys_context(request)["MS_TRANS"])
+        with self.assertNumQueries(0):
+            self.assertEqual(microsys_context(request)["CURRENT_LANG"], "ar")
+
+
+class SidebarInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_superuser(username="root", password="x")
+
+    def _labels(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = SessionBase()
+        groups = microsys_context(request)["sidebar_extra_groups"]
+        return {item["label"] for group in groups.values() for item in group["items"]}
+
+    def test_clear_sidebar_cache_bumps_generation(self):
+        self._labels()
+        with mock.patch.object(context_processors, "discover_list_urls", return_value=[]) as discover:
+            self._labels()
+            discover.assert_not_called()
+
+            generation = context_processors.get_sidebar_generation()
+            call_command("microsys_clear_cache", stdout=StringIO())
+            self.assertEqual(context_processors.get_sidebar_generation(), generation + 1)
+
+            self._labels()
+            discover.assert_called_once()
+
+    def test_evicted_generation_is_reseeded(self):
+        self._labels()
+        cache.delete(context_processors.SIDEBAR_GENERATION_KEY)
+        with mock.patch.object(context_processors, "discover_list_urls", return_value=[]) as discover:
+            self._labels()
+            discover.assert_called_once()
+
+    def test_settings_change_invalidates(self):
+        self.assertNotIn("Reports", self._labels())
+        extra = {"Tools": {"items": [{"url_name": "options_view", "label": "Reports"}]}}
+        with override_settings(SIDEBAR_AUTO={"EXTRA_ITEMS": extra}):
+            self.assertIn("Reports", self._labels())
+        self.assertNotIn("Reports", self._labels())
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from microsys import middleware
+from microsys.models import Profile, Scope, UserActivityLog
+from microsys.signals import get_logging_policy
+
+
+class SoftDeleteStateTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="member", password="x")
+        self.profile = Profile.all_objects.get(user=user)
+
+    def test_save_does_not_reload_instance(self):
+        # Benchmark: only the UPDATE itself, no pre_save SELECT of the old row
+        with self.assertNumQueries(1):
+            self.profile.save()
+        with self.assertNumQueries(1):
+            self.profile.save(update_fields=["phone"])
+
+    def test_soft_delete_transition_is_detected(self):
+        self.profile.deleted_at = timezone.now()
+        self.profile.save()
+        self.assertTrue(self.profile._was_not_deleted)
+
+        # Saving an already deleted record again is not a new transition
+        self.profile.save()
+        self.assertFalse(self.profile._was_not_deleted)
+
+    def test_refresh_then_save_is_not_a_new_soft_delete(self):
+        # Soft-deleted elsewhere after this instance was loaded
+        Profile.all_objects.filter(pk=self.profile.pk).update(deleted_at=timezone.now())
+        self.profile.refresh_from_db()
+        self.profile.save()
+        self.assertFalse(self.profile._was_not_deleted)
+
+    def test_deferred_field_falls_back_to_stored_state(self):
+        profile = Profile.all_objects.defer("deleted_at").get(pk=self.profile.pk)
+        profile.phone = "0910000000"
+        profile.save()
+        self.assertTrue(profile._was_not_deleted)
+
+
+class LoggingPolicyTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="writer", password="x")
+        self.addCleanup(middleware.reset_current_user, middleware.set_current_user(self.user))
+
+    def _scope_logs(self):
+        return UserActivityLog.all_objects.filter(model_name=Scope._meta.verbose_name)
+
+    def test_builtin_exclusions(self):
+        self.assertTrue(get_logging_policy(UserActivityLog)["skip"])
+        self.assertTrue(get_logging_policy(Profile)["skip"])
+        self.assertFalse(get_logging_policy(Scope)["skip"])
+
+    def test_scope_saves_are_logged_by_default(self):
+        Scope.objects.create(name="north")
+        self.assertEqual(self._scope_logs().count(), 1)
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"exclude": ["microsys.Scope"]}})
+    def test_exclude_setting_skips_model(self):
+        Scope.objects.create(name="north")
+        self.assertEqual(self._scope_logs().count(), 0)
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"include": ["auth"]}})
+    def test_include_setting_limits_logging_to_listed_apps(self):
+        Scope.objects.create(name="north")
+        self.assertEqual(self._scope_logs().count(), 0)
+        self.assertFalse(get_logging_policy(get_user_model())["skip"])
+
+    @override_settings(MICROSYS_CONFIG={"activity_log": {"ignore_fields": {"microsys.scope": ["name"]}}})
+    def test_ignored_update_fields_are_not_logged(self):
+        scope = Scope.objects.create(name="north")
+        scope.name = "south"
+        scope.save(update_fields=["name"])
+        self.assertEqual(self._scope_logs().filter(action="UPDATE").count(), 0)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from microsys import views
+from microsys.forms import SubsectionChoiceField
+from microsys.models import Scope
+
+
+class SubsectionChoiceFieldTests(TestCase):
+    def setUp(self):
+        self.scopes = [Scope.objects.create(name=f"Scope {i:02d}") for i in range(12)]
+
+    def _form(self, data=None, limit=None, selected=()):
+        form = forms.Form(data)
+        form.fields["children"] = SubsectionChoiceField(queryset=Scope.objects.all(), limit=limit, required=False)
+        form.fields["children"].selected = list(selected)
+        return form
+
+    def test_rows_are_loaded_once_for_validation_and_render(self):
+        picked = [str(self.scopes[0].pk), str(self.scopes[3].pk)]
+        form = self._form({"children": picked})
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+            html = str(form["children"])
+            self.assertEqual(len(list(form["children"])), 12)
+        self.assertEqual({scope.pk for scope in form.cleaned_data["children"]}, {self.scopes[0].pk, self.scopes[3].pk})
+        self.assertIn("Scope 11", html)
+
+    def test_unknown_choice_is_rejected(self):
+        form = self._form({"children": ["999999"]})
+        self.assertFalse(form.is_valid())
+        self.assertIn("children", form.errors)
+
+    def test_large_tables_render_first_rows_plus_selected(self):
+        form = self._form(limit=5, selected=[self.scopes[10].pk])
+        labels = [choice.choice_label for choice in form["children"]]
+        self.assertTrue(form.fields["children"].truncated)
+        self.assertEqual(labels, ["Scope 00", "Scope 01", "Scope 02", "Scope 03", "Scope 04", "Scope 10"])
+
+    def test_large_tables_still_accept_unrendered_rows(self):
+        form = self._form({"children": [str(self.scopes[8].pk)]}, limit=5)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(list(form.cleaned_data["children"]), [self.scopes[8]])
+
+    def test_bogus_pk_in_large_tables_is_a_form_error(self):
+        form = self._form({"children": ["abc"]}, limit=2, selected=["abc"])
+        self.assertFalse(form.is_valid())
+        self.assertIn("children", form.errors)
+
+
+class SubsectionSearchViewTests(TestCase):
+    def setUp(self):
+        Scope.objects.create(name="Alpha")
+        Scope.objects.create(name="Beta")
+        self.client.force_login(get_user_model().objects.create_superuser(username="admin", password="x"))
+        sections = [{"model_name": "parent", "subsections": [{"model_name": "scope", "model": Scope}]}]
+        patcher = mock.patch.object(views, "discover_section_models", return_value=sections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_returns_matching_children(self):
+        response = self.client.get(reverse("subsection_choices"), {"model": "scope", "q": "alp"})
+        self.assertEqual(response.json()["results"], [{"id": Scope.objects.get(name="Alpha").pk, "text": "Alpha"}])
+        self.assertFalse(response.json()["has_more"])
+
+    def test_only_subsection_models_are_searchable(self):
+        response = self.client.get(reverse("subsection_choices"), {"model": "user", "q": "a"})
+        self.assertEqual(response.status_code, 404)
@@ -37,6 +37,7 @@ urlpatterns = [
     path('sys/options/', views.options_view, name='options_view'),
     path('sys/sections/', views.core_models_view, name='manage_sections'),
     path('sys/subsection/add/', views.add_subsection, name='add_subsection'),
+    path('sys/subsection/choices/', views.subsection_choices, name='subsection_choices'),
     path('sys/subsection/edit/<int:pk>/', views.edit_subsection, name='edit_subsection'),
     path('sys/subsection/delete/<int:pk>/', views.delete_subsection, name='delete_subsection'),
     path('sys/section/delete/', views.delete_section, name='delete_section'),
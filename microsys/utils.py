@@ -11,11 +11,18 @@ except ImportError:
     django_filters = None
 
 from django.db.models import ManyToManyField, ManyToManyRel, Q
-from django.db import models as dj_models
+from django.db import connections, models as dj_models
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.utils.functional import SimpleLazyObject, empty
 from decimal import Decimal, InvalidOperation
+import hashlib
 import inspect
+import time
+import warnings
 from .translations import get_strings
 from django.conf import settings
+from django.core.cache import cache
+from .middleware import get_current_request
 
 def _get_default_strings():
     """Helper to get default global strings dict"""
@@ -106,18 +113,37 @@ def _get_model_app_bases(model):
     return bases
 
 
+# Results of convention imports, misses included (Python doesn't cache failed imports):
+# {(model module, app_label, model name, submodule, class_suffix): class or None}
+_CONVENTION_IMPORTS = {}
+
+
+def clear_convention_import_cache():
+    """Forget convention import results (called on dev-server file changes)."""
+    _CONVENTION_IMPORTS.clear()
+
+
 def _import_by_convention(model, submodule, class_suffix):
     """
     Try importing a class following App.<submodule>.ModelName<class_suffix>.
     Returns class or None if not found.
     """
+    key = (model.__module__, model._meta.app_label, model.__name__, submodule, class_suffix)
+    try:
+        return _CONVENTION_IMPORTS[key]
+    except KeyError:
+        pass
+
     class_name = f"{model.__name__}{class_suffix}"
+    result = None
     for base in _get_model_app_bases(model):
         try:
-            return import_string(f"{base}.{submodule}.{class_name}")
+            result = import_string(f"{base}.{submodule}.{class_name}")
+            break
         except ImportError:
             continue
-    return None
+    _CONVENTION_IMPORTS[key] = result
+    return result
 
 
 def _resolve_model_class(model, getter_name):
@@ -158,10 +184,42 @@ def _model_is_section(model):
     return bool(getattr(model._meta, 'is_section', False))
 
 
+# Generated Form/Table/Filter classes and relation plans are memoized on the model
+# class itself, so they live exactly as long as the model (isolate_apps models are
+# collected with theirs). A WeakKeyDictionary keyed by model would never drop them:
+# the memoized values reference the model, keeping the key alive.
+MODEL_MEMO_ATTR = '_microsys_memo'
+
+
+def _memoize_on_model(model, key, build):
+    """Return build(model), memoized per model class under key."""
+    memo = model.__dict__.get(MODEL_MEMO_ATTR)
+    if memo is None:
+        memo = {}
+        setattr(model, MODEL_MEMO_ATTR, memo)
+    try:
+        return memo[key]
+    except KeyError:
+        result = memo[key] = build(model)
+        return result
+
+
+def clear_generated_classes():
+    """Drop the memoized Form/Table/Filter classes (and relation plans) of every installed model."""
+    for model in apps.get_models(include_auto_created=True):
+        if MODEL_MEMO_ATTR in model.__dict__:
+            delattr(model, MODEL_MEMO_ATTR)
+
+
 def resolve_form_class_for_model(model):
     """
     Resolve a ModelForm class for a model using conventions or fallbacks.
+    Memoized per model and scope state (the generic form excludes 'scope' when disabled).
     """
+    return _memoize_on_model(model, ('form', _scope_state(model)), _build_form_class_for_model)
+
+
+def _build_form_class_for_model(model):
     form_class = _import_by_convention(model, "forms", "Form")
     if not form_class:
         form_class = (
@@ -196,12 +254,7 @@ def resolve_form_class_for_model(model):
         else:
             raw_exclude = list(raw_exclude)
 
-        try:
-            has_scope_field = model._meta.get_field("scope") is not None
-        except Exception:
-            has_scope_field = False
-
-        if has_scope_field and not is_scope_enabled():
+        if _has_scope_field(model) and not _scope_state(model):
             exclude = ["scope", *raw_exclude]
             # Remove duplicates while preserving order
             exclude = list(dict.fromkeys(exclude))
@@ -214,62 +267,263 @@ def resolve_form_class_for_model(model):
     return form_class
 
 
-def collect_related_objects(instance):
+def get_relation_plan(model):
+    """
+    Relation metadata of a model, computed once and memoized on the model:
+        'related': reverse relations and forward M2Ms in field order (collect_related_objects)
+        'reverse': reverse relations (dicts with accessor, related_model, kind flags)
+        'auto_ignore': accessors never counted as locking (M2M parents and their through tables)
+        'lock_relations': reverse relations checked by has_related_records/locked_related_ids
+        'forward_m2m': forward ManyToManyFields
+        'detail_fields': (field, display method name or None) for concrete fields
+    Entries of 'related' also carry 'display_field', the column used by the
+    related-object preview (see _preview_display_field).
+    """
+    return _memoize_on_model(model, ('relations',), _build_relation_plan)
+
+
+def _build_relation_plan(model):
+    from django.db.models.fields.related import ManyToOneRel
+
+    fields = model._meta.get_fields()
+
+    # M2M relations pointing at us (we are the 'child') and their through tables
+    auto_ignore = set()
+    through_models = set()
+    for field in fields:
+        if isinstance(field, ManyToManyRel):
+            accessor_name = field.get_accessor_name()
+            if accessor_name:
+                auto_ignore.add(accessor_name)
+            if getattr(field, 'through', None):
+                through_models.add(field.through)
+
+    # FKs from those through tables are part of the parent's M2M, not real dependents
+    for field in fields:
+        if isinstance(field, ManyToOneRel) and field.related_model in through_models:
+            accessor_name = field.get_accessor_name()
+            if accessor_name:
+                auto_ignore.add(accessor_name)
+
+    reverse = []
+    forward_m2m = []
+    related = []
+    for field in fields:
+        if field.auto_created and not field.concrete:
+            accessor_name = field.get_accessor_name()
+            if not accessor_name:
+                continue
+            rel = {
+                'field': field,
+                'accessor': accessor_name,
+                'related_model': field.related_model,
+                'fk_name': field.field.name,
+                'display_field': _preview_display_field(field.related_model),
+                'forward': False,
+                'one_to_many': field.one_to_many,
+                'one_to_one': field.one_to_one,
+                'many_to_many': field.many_to_many,
+            }
+            reverse.append(rel)
+            related.append(rel)
+        elif field.many_to_many:
+            forward_m2m.append(field)
+            related.append({
+                'field': field,
+                'accessor': field.name,
+                'related_model': field.related_model,
+                'display_field': _preview_display_field(field.related_model),
+                'forward': True,
+                'one_to_many': False,
+                'one_to_one': False,
+                'many_to_many': True,
+            })
+
+    lock_relations = tuple(
+        rel for rel in reverse
+        if rel['accessor'] not in auto_ignore and (rel['one_to_many'] or rel['one_to_one'])
+    )
+    detail_fields = tuple(
+        (field, f"get_{field.name}_display" if hasattr(model, f"get_{field.name}_display") else None)
+        for field in model._meta.fields
+    )
+    return {
+        'related': tuple(related),
+        'reverse': tuple(reverse),
+        'auto_ignore': frozenset(auto_ignore),
+        'lock_relations': lock_relations,
+        'forward_m2m': tuple(forward_m2m),
+        'detail_fields': detail_fields,
+    }
+
+
+def collect_related_objects(instance, preview=False):
     """
     Introspects a model instance to find all related objects (Reverse FK, M2M).
     Returns a dictionary: { 'Verbose Name Plural': ['Item 1', 'Item 2'] }
     Used for Smart Delete functionality and Smart View.
+    With preview=True the work is bounded (see _collect_related_preview).
     """
+    if preview:
+        return _collect_related_preview(instance)
+
     related_data = {}
     
-    # Iterate over all fields to find relations
-    for field in instance._meta.get_fields():
-        if field.auto_created and not field.concrete:
-            # Reverse Relations (OneToMany, OneToOne)
-            # e.g. department.affiliate_set
-            try:
-                accessor = field.get_accessor_name()
-                if not accessor: continue
-                
-                related_msg = getattr(instance, accessor, None)
-                if related_msg:
-                    # Check if it's a Manager (OneToMany) or single object (OneToOne)
-                    if hasattr(related_msg, 'all'):
-                        # Limit to reasonable amount
-                        qs = related_msg.all()[:20] 
-                        if qs:
-                            items = [str(obj) for obj in qs]
-                            name = field.related_model._meta.verbose_name_plural
-                            related_data[name] = items
-                    else:
-                        # OneToOne
-                        name = field.related_model._meta.verbose_name
-                        related_data[name] = [str(related_msg)]
-            except Exception:
-                pass
-                
-        elif field.many_to_many:
-            # Forward M2M
-            try:
-                manager = getattr(instance, field.name, None)
-                if manager:
-                    qs = manager.all()[:20]
+    # Reverse Relations (OneToMany, OneToOne, e.g. department.affiliate_set) and forward M2M
+    for rel in get_relation_plan(instance._meta.model)['related']:
+        try:
+            related_msg = getattr(instance, rel['accessor'], None)
+            if related_msg:
+                # Check if it's a Manager (OneToMany, M2M) or single object (OneToOne)
+                if hasattr(related_msg, 'all'):
+                    # Limit to reasonable amount
+                    qs = related_msg.all()[:20] 
                     if qs:
                         items = [str(obj) for obj in qs]
-                        name = field.related_model._meta.verbose_name_plural
+                        name = rel['related_model']._meta.verbose_name_plural
                         related_data[name] = items
-            except Exception:
-                pass
+                elif not rel['forward']:
+                    # OneToOne
+                    name = rel['related_model']._meta.verbose_name
+                    related_data[name] = [str(related_msg)]
+        except Exception:
+            pass
                 
     return related_data
 
 
+
+PREVIEW_DISPLAY_FIELDS = ('name', 'title', 'number')
+DEFAULT_RELATED_PREVIEW_ITEMS = 20
+DEFAULT_RELATED_PREVIEW_RELATIONS = 10
+
+
+def _preview_display_field(model):
+    """First plain column of PREVIEW_DISPLAY_FIELDS on the model, or None."""
+    for name in PREVIEW_DISPLAY_FIELDS:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete and not field.is_relation:
+            return name
+    return None
+
+
+def _preview_select_related(model):
+    """Forward FK/OneToOne names of a model, for previews rendered with str()."""
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if field.is_relation and (field.many_to_one or field.one_to_one)
+    )
+
+
+def subsection_search_q(model, term):
+    """Q matching `term` in the preview display column, else in every text column."""
+    display_field = _preview_display_field(model)
+    if display_field:
+        names = [display_field]
+    else:
+        names = [
+            field.name for field in model._meta.concrete_fields
+            if isinstance(field, (dj_models.CharField, dj_models.TextField)) and not field.choices
+        ]
+    query = Q(pk__in=[])
+    for name in names:
+        query |= Q(**{f'{name}__icontains': term})
+    return query
+
+
+def _related_count_expression(rel):
+    """Correlated COUNT of the rows behind a relation, for annotating the parent."""
+    from django.db.models import Count, IntegerField, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    field = rel['field']
+    # Count through the related model's default manager, like the preview rows
+    # (soft-deleted and out-of-scope rows are excluded from both)
+    if rel['forward']:
+        group_by = field.related_query_name()
+        queryset = rel['related_model']._default_manager.filter(**{group_by: OuterRef('pk')})
+    elif rel['many_to_many']:
+        group_by = field.field.name
+        queryset = rel['related_model']._default_manager.filter(**{group_by: OuterRef('pk')})
+    else:
+        queryset = rel['related_model']._default_manager.filter(**{rel['fk_name']: OuterRef(field.field_name)})
+        group_by = rel['fk_name']
+    counts = queryset.order_by().values(group_by).annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _collect_related_preview(instance):
+    """
+    Bounded variant of collect_related_objects for Smart View / Smart Delete.
+
+    One aggregated query counts every relation; rows are then fetched only
+    for non-empty relations, at most MICROSYS_CONFIG['related_preview_relations']
+    of them (default 10), each limited to 'related_preview_items' rows
+    (default 20) and reading just the display column when the related model
+    has one (name/title/number). Truncated lists end with a "… +N" item.
+    """
+    ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+    item_limit = ms_config.get('related_preview_items', DEFAULT_RELATED_PREVIEW_ITEMS)
+    relation_budget = ms_config.get('related_preview_relations', DEFAULT_RELATED_PREVIEW_RELATIONS)
+
+    model = instance._meta.model
+    relations = get_relation_plan(model)['related']
+    annotations = {}
+    for index, rel in enumerate(relations):
+        try:
+            annotations[f'related_{index}'] = _related_count_expression(rel)
+        except Exception:
+            pass
+    if not annotations:
+        return {}
+
+    counts = model._base_manager.filter(pk=instance.pk).annotate(**annotations).values(*annotations).first() or {}
+    related_data = {}
+    for index, rel in enumerate(relations):
+        total = counts.get(f'related_{index}')
+        if not total:
+            continue
+        meta = rel['related_model']._meta
+        name = meta.verbose_name if rel['one_to_one'] else meta.verbose_name_plural
+        if relation_budget <= 0:
+            related_data[name] = [f"… +{total}"]
+            continue
+        relation_budget -= 1
+
+        try:
+            if rel['many_to_many']:
+                queryset = getattr(instance, rel['accessor']).all()
+            else:
+                queryset = rel['related_model']._default_manager.filter(**{rel['fk_name']: instance})
+            if rel['display_field']:
+                rows = queryset.values_list(rel['display_field'], flat=True)[:item_limit]
+            else:
+                # __str__ may follow FKs; fetch them in the same query
+                rows = queryset.select_related(*_preview_select_related(rel['related_model']))[:item_limit]
+            items = [str(row) for row in rows]
+        except Exception:
+            continue
+        if total > len(items):
+            items.append(f"… +{total - len(items)}")
+        related_data[name] = items
+
+    return related_data
+
+
 def _build_generic_table_class(model):
     """
     Build a minimal django-tables2 Table for a model.
     Build Meta dynamically so django-tables2 sees Meta.model at class creation.
     Includes row_attrs for context menu support.
+    Memoized per model and scope state (the 'scope' column is excluded when disabled).
     """
+    return _memoize_on_model(model, ('table', _scope_state(model)), _create_generic_table_class)
+
+
+def _create_generic_table_class(model):
     raw_exclude = getattr(model, "table_exclude", None)
     if raw_exclude is None:
         raw_exclude = []
@@ -278,12 +532,7 @@ def _build_generic_table_class(model):
     else:
         raw_exclude = list(raw_exclude)
 
-    try:
-        has_scope_field = model._meta.get_field("scope") is not None
-    except Exception:
-        has_scope_field = False
-
-    if has_scope_field and not is_scope_enabled():
+    if _has_scope_field(model) and not _scope_state(model):
         raw_exclude.append("scope")
 
     meta_attrs = {
@@ -357,7 +606,12 @@ def _build_generic_filter_class(model):
     Build a minimal django-filters FilterSet:
     - keyword search across text fields (and numeric fields if value is numeric)
     - optional year dropdown if any date/datetime field exists
+    Memoized per model.
     """
+    return _memoize_on_model(model, ('filter',), _create_generic_filter_class)
+
+
+def _create_generic_filter_class(model):
     if not django_filters:
         return None
 
@@ -510,18 +764,77 @@ def _build_generic_filter_class(model):
     return type(f"{model.__name__}AutoFilter", (django_filters.FilterSet,), attrs)
 
 
+SCOPE_ENABLED_CACHE_KEY = 'microsys_scope_enabled'
+SCOPE_ENABLED_REQUEST_ATTR = '_microsys_scope_enabled'
+
+
 def is_scope_enabled():
     """
     Checks if the Scope system is globally enabled.
+    The flag is memoized on the current request and kept in the cache, so a
+    full page render hits ScopeSettings at most once. The cache entry is
+    refreshed by a post_save signal on ScopeSettings.
     Returns:
         bool: True if enabled, False otherwise.
     """
+    request = get_current_request()
+    enabled = getattr(request, SCOPE_ENABLED_REQUEST_ATTR, None)
+    if enabled is not None:
+        return enabled
+
+    enabled = cache.get(SCOPE_ENABLED_CACHE_KEY)
+    if enabled is None:
+        try:
+            ScopeSettings = apps.get_model('microsys', 'ScopeSettings')
+            enabled = ScopeSettings.load().is_enabled
+        except LookupError:
+            # Fallback if model shouldn't be loaded yet (e.g. migration)
+            return True
+        set_scope_enabled_cache(enabled)
+
+    if request is not None:
+        setattr(request, SCOPE_ENABLED_REQUEST_ATTR, enabled)
+    return enabled
+
+
+def _has_scope_field(model):
     try:
-        ScopeSettings = apps.get_model('microsys', 'ScopeSettings')
-        return ScopeSettings.load().is_enabled
-    except LookupError:
-        # Fallback if model shouldn't be loaded yet (e.g. migration)
-        return True
+        return model._meta.get_field("scope") is not None
+    except Exception:
+        return False
+
+
+def _scope_state(model):
+    """
+    The scope flag as seen by generated classes of `model`: always False for
+    models without a 'scope' field (no query), and False when the database
+    cannot be reached, as in ScopedManager.get_queryset.
+    """
+    if not _has_scope_field(model):
+        return False
+    try:
+        return is_scope_enabled()
+    except Exception:
+        return False
+
+
+def set_scope_enabled_cache(enabled):
+    """
+    Store the scope flag in the cache and on the current request.
+    Pass None to drop the cached value so the next lookup reads the database.
+    """
+    ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+    if enabled is None:
+        cache.delete(SCOPE_ENABLED_CACHE_KEY)
+    else:
+        cache.set(SCOPE_ENABLED_CACHE_KEY, enabled, timeout=ms_config.get('scope_cache_timeout', 60))
+
+    request = get_current_request()
+    if request is not None:
+        if enabled is None:
+            request.__dict__.pop(SCOPE_ENABLED_REQUEST_ATTR, None)
+        else:
+            setattr(request, SCOPE_ENABLED_REQUEST_ATTR, enabled)
 
 
 def _is_child_model(model, app_name=None):
@@ -560,70 +873,164 @@ def has_related_records(instance, ignore_relations=None):
     This includes the M2M reverse accessor AND any FK from through tables
     (both auto-created and custom through models like AffiliateDepartment).
     """
-    from django.db.models.fields.related import ManyToManyRel, ManyToOneRel
-    
     if not instance:
         return False
     
-    if ignore_relations is None:
-        ignore_relations = []
-    
-    # Auto-detect M2M parent relations to ignore
-    # Step 1: Collect all through-table models from M2M relationships pointing at us
-    auto_ignore = set()
-    through_models = set()
-    
-    for field in instance._meta.get_fields():
-        if isinstance(field, ManyToManyRel):
-            # This is the "reverse" side of a M2M - the parent points to us
-            accessor_name = field.get_accessor_name()
-            if accessor_name:
-                auto_ignore.add(accessor_name)
-            # Track through table (works for both auto-created and custom)
-            if hasattr(field, 'through') and field.through:
-                through_models.add(field.through)
-    
-    # Step 2: Any ManyToOneRel whose source model is a known through table
-    # should also be ignored (the FK from the through table to this model)
-    for field in instance._meta.get_fields():
-        if isinstance(field, ManyToOneRel):
-            if field.related_model in through_models:
-                accessor_name = field.get_accessor_name()
-                if accessor_name:
-                    auto_ignore.add(accessor_name)
+    ignore_relations = set(ignore_relations or [])
     
-    for related_object in instance._meta.get_fields():
-        if related_object.is_relation and related_object.auto_created:
-            # Reverse relationship (Someone points to us)
-            accessor_name = related_object.get_accessor_name()
-            if not accessor_name:
-                continue
-            if accessor_name in ignore_relations or accessor_name in auto_ignore:
-                continue
-                
-            try:
-                # Get the related manager/descriptor
-                related_item = getattr(instance, accessor_name)
-                
-                # Check based on relationship type
-                if related_object.one_to_many or related_object.many_to_many:
-                     if related_item.exists():
-                         return True
-                elif related_object.one_to_one:
-                     # OneToOne
-                     pass 
-            except Exception:
-                # DoesNotExist or other issues
-                continue
+    # Reverse relationships (someone points to us), minus the auto-ignored M2M parents
+    for rel in get_relation_plan(instance._meta.model)['lock_relations']:
+        if rel['accessor'] in ignore_relations:
+            continue
             
-            # For O2O
-            if related_object.one_to_one and related_item:
+        try:
+            # Get the related manager/descriptor
+            related_item = getattr(instance, rel['accessor'])
+            
+            # Check based on relationship type
+            if rel['one_to_many']:
+                if related_item.exists():
+                    return True
+            elif related_item:
+                # OneToOne
                 return True
+        except Exception:
+            # DoesNotExist or other issues
+            continue
                 
     return False
 
 
+# Chunk size for pk__in lookups (keeps well under SQLite's bound parameter limit)
+LOCKED_IDS_CHUNK_SIZE = 500
+
+
+def locked_related_ids(model, pks, ignore_relations=None):
+    """
+    Set-based has_related_records(): return the subset of `pks` whose rows
+    have related records, with one grouped query per reverse relation
+    (per chunk of pks) instead of one query per row and relation.
+    Follows the same rules as has_related_records (M2M parent relations and
+    their through tables are ignored, as are `ignore_relations` accessors).
+    """
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return set()
+
+    ignore_relations = set(ignore_relations or [])
+
+    locked = set()
+    for rel in get_relation_plan(model)['lock_relations']:
+        if rel['accessor'] in ignore_relations:
+            continue
+
+        remaining = [pk for pk in pks if pk not in locked]
+        if not remaining:
+            break
+
+        # Reverse FK managers use the default (scoped) manager, reverse O2O the base manager
+        related_model = rel['related_model']
+        manager = related_model._default_manager if rel['one_to_many'] else related_model._base_manager
+        fk_name = rel['fk_name']
+        try:
+            for start in range(0, len(remaining), LOCKED_IDS_CHUNK_SIZE):
+                chunk = remaining[start:start + LOCKED_IDS_CHUNK_SIZE]
+                locked.update(
+                    manager.filter(**{f'{fk_name}__pk__in': chunk})
+                    .order_by()
+                    .values_list(f'{fk_name}__pk', flat=True)
+                    .distinct()
+                )
+        except Exception:
+            # Mirror has_related_records: a broken relation never locks anything
+            continue
+
+    return locked
+
+
+def get_cache_generation(key):
+    """Return a shared generation counter from the cache, seeding it on first use."""
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock so an evicted counter never revives old entries
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(key, 0)
+    return generation
+
+
+def bump_cache_generation(key):
+    """Advance a shared generation counter, invalidating everything keyed on it."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter not set (or evicted): a fresh seed differs from any previous value
+        cache.set(key, time.time_ns() // 1000, timeout=None)
+
+
+# Process-wide section registry, filled on first use:
+# {(app_name, include_children, scope_enabled): [section info dicts]}
+# A shared generation counter lets any process invalidate it in all workers.
+SECTION_GENERATION_KEY = 'microsys_section_generation'
+_SECTION_REGISTRY = {}
+_section_registry_generation = None
+
+
+def clear_section_registry(everywhere=True):
+    """
+    Forget discovered section models and their generated classes.
+    Call this when models, forms, tables or filters change at runtime.
+    everywhere=False only clears the registry of the current process.
+    """
+    _SECTION_REGISTRY.clear()
+    clear_generated_classes()
+    if everywhere:
+        bump_cache_generation(SECTION_GENERATION_KEY)
+
+
 def discover_section_models(app_name=None, include_children=False):
+    """
+    Return the section models of the project (see _discover_section_models).
+    Results are built once per process and reused across requests; when a
+    discovered model has a 'scope' field, the scope flag is part of the key
+    since generated forms/tables depend on it.
+    The returned dicts are shared, so treat them as read-only.
+    """
+    global _section_registry_generation
+    generation = get_cache_generation(SECTION_GENERATION_KEY)
+    if generation != _section_registry_generation:
+        _SECTION_REGISTRY.clear()
+        if _section_registry_generation is not None:
+            clear_generated_classes()
+        _section_registry_generation = generation
+
+    # The scope flag only matters (and is only read) when a discovered model has a 'scope' field
+    entry = _SECTION_REGISTRY.get((app_name, include_children))
+    if entry is None:
+        section_models = _discover_section_models(app_name, include_children)
+        scoped = [
+            model for model in _section_registry_models(section_models) if _has_scope_field(model)
+        ]
+        entry = _SECTION_REGISTRY[(app_name, include_children)] = {
+            'scoped': scoped[0] if scoped else None,
+            'by_flag': {_scope_state(scoped[0]) if scoped else False: section_models},
+        }
+        return list(section_models)
+
+    flag = _scope_state(entry['scoped']) if entry['scoped'] else False
+    section_models = entry['by_flag'].get(flag)
+    if section_models is None:
+        section_models = entry['by_flag'][flag] = _discover_section_models(app_name, include_children)
+    return list(section_models)
+
+
+def _section_registry_models(section_models):
+    for sm in section_models:
+        yield sm['model']
+        for sub in sm.get('subsections', []):
+            yield sub['model']
+
+
+def _discover_section_models(app_name=None, include_children=False):
     """
     Discover section models based on explicit `is_section = True` in class/meta.
     Automatically resolves Form, Table, and Filter classes (by convention or generation).
@@ -757,6 +1164,136 @@ def discover_section_models(app_name=None, include_children=False):
     return section_models
 
 
+class LazyContextValue(SimpleLazyObject):
+    """
+    Context value computed on first access.
+    Templates call callables during variable resolution, so calling it
+    returns the real value (filters like json_script get a plain dict).
+    """
+    def __call__(self):
+        if self._wrapped is empty:
+            self._setup()
+        return self._wrapped
+
+
+SECTION_COUNTS_CACHE_PREFIX = 'microsys_section_counts'
+DEFAULT_SECTION_COUNTS_TIMEOUT = 60
+
+
+def section_counts_cache_key(model):
+    return f"{SECTION_COUNTS_CACHE_PREFIX}:{model._meta.label_lower}"
+
+
+def clear_section_counts(model):
+    """Drop the cached counts of a section model (all scopes)."""
+    cache.delete(section_counts_cache_key(model))
+
+
+def _count_signature(queryset):
+    """
+    Identify what a count query actually counts (scope and soft-delete filters
+    included), so cached counts are never shared between different scopes.
+    """
+    try:
+        sql, params = queryset.order_by().query.get_compiler(using=queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    raw = f"{queryset.db}|{sql}|{params!r}"
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+class SectionCounts:
+    """
+    Row counts of section models for the sections page tabs.
+
+    Counts are computed on demand: `counts[model_name]` runs one COUNT,
+    `lazy(model_name)` defers it until a template reads the value, and
+    `all()` fetches every missing count in a single UNION ALL query.
+    Results are cached briefly (MICROSYS_CONFIG['section_counts_timeout'],
+    default 60s) per model and scope, and dropped when a section model
+    instance is saved or deleted.
+    """
+
+    def __init__(self, section_models):
+        self.models = {sm['model_name']: sm['model'] for sm in section_models}
+        self._counts = {}
+
+    @property
+    def timeout(self):
+        ms_config = getattr(settings, 'MICROSYS_CONFIG', {})
+        return ms_config.get('section_counts_timeout', DEFAULT_SECTION_COUNTS_TIMEOUT)
+
+    def __getitem__(self, model_name):
+        if model_name not in self._counts:
+            self._load([model_name])
+        return self._counts[model_name]
+
+    def lazy(self, model_name):
+        return LazyContextValue(lambda: self[model_name])
+
+    def all(self):
+        """Return {model_name: count} for every section model."""
+        self._load([name for name in self.models if name not in self._counts])
+        return {name: self._counts[name] for name in self.models}
+
+    def _load(self, model_names):
+        if not model_names:
+            return
+
+        pending = {}
+        cached = cache.get_many([section_counts_cache_key(self.models[name]) for name in model_names])
+        for name in model_names:
+            model = self.models[name]
+            queryset = model.objects.all()
+            signature = _count_signature(queryset)
+            if signature is None:
+                self._counts[name] = 0
+                continue
+            entry = cached.get(section_counts_cache_key(model)) or {}
+            if signature in entry:
+                self._counts[name] = entry[signature]
+            else:
+                pending[name] = (queryset, signature, entry)
+
+        if not pending:
+            return
+
+        if len(pending) == 1:
+            name, (queryset, _, _) = next(iter(pending.items()))
+            counts = {name: queryset.count()}
+        else:
+            counts = self._count_union({name: item[0] for name, item in pending.items()})
+
+        to_cache = {}
+        for name, count in counts.items():
+            _, signature, entry = pending[name]
+            self._counts[name] = entry[signature] = count
+            to_cache[section_counts_cache_key(self.models[name])] = entry
+        cache.set_many(to_cache, timeout=self.timeout)
+
+    @staticmethod
+    def _count_union(querysets):
+        """Count several querysets in one round-trip per database (UNION ALL of COUNTs)."""
+        by_db = {}
+        for name, queryset in querysets.items():
+            by_db.setdefault(queryset.db, []).append((name, queryset))
+
+        counts = {}
+        for alias, entries in by_db.items():
+            parts = []
+            params = []
+            for idx, (name, queryset) in enumerate(entries):
+                # Compile for the database the UNION runs on (sql_with_params() always uses 'default')
+                sql, query_params = queryset.order_by().values('pk').query.get_compiler(using=alias).as_sql()
+                parts.append(f"SELECT {idx} AS idx, COUNT(*) AS total FROM ({sql}) section_{idx}")
+                params.extend(query_params)
+            with connections[alias].cursor() as cursor:
+                cursor.execute(" UNION ALL ".join(parts), params)
+                for idx, total in cursor.fetchall():
+                    counts[entries[idx][0]] = total
+        return counts
+
+
 def get_default_section_model(app_name=None):
     """
     Get the first available section model name for auto-selection.
@@ -810,10 +1347,37 @@ def get_model_classes(model_name, app_label=None):
     }
 
 
+# Lazily built {name: model} lookup for resolve_model_by_name, plus the names
+# shared by models of different apps: {'index': {...}, 'ambiguous': {name: [models]}}
+_MODEL_NAME_INDEX = None
+
+
+def clear_model_name_index():
+    """Rebuild the model name index on next use (e.g. after models are added)."""
+    global _MODEL_NAME_INDEX
+    _MODEL_NAME_INDEX = None
+
+
+def _get_model_name_index():
+    global _MODEL_NAME_INDEX
+    if _MODEL_NAME_INDEX is None:
+        index = {}
+        ambiguous = {}
+        for model in apps.get_models():
+            for name in {model._meta.model_name, model.__name__.lower()}:
+                existing = index.setdefault(name, model)
+                if existing is not model:
+                    # Keep the first match (app order), like the former linear scan
+                    ambiguous.setdefault(name, [existing]).append(model)
+        _MODEL_NAME_INDEX = {'index': index, 'ambiguous': ambiguous, 'warned': set()}
+    return _MODEL_NAME_INDEX
+
+
 def resolve_model_by_name(model_name, app_label=None):
     """
     Resolve a model by name, optionally constrained to an app label.
-    Falls back to scanning all apps if app_label is not provided.
+    Falls back to a name index of all apps if app_label is not provided
+    (first installed app wins when several apps define the same model name).
     """
     if not model_name:
         return None
@@ -826,12 +1390,17 @@ def resolve_model_by_name(model_name, app_label=None):
         except LookupError:
             return None
 
-    for model in apps.get_models():
-        meta = model._meta
-        if meta.model_name == normalized or model.__name__.lower() == normalized:
-            return model
-
-    return None
+    lookup = _get_model_name_index()
+    model = lookup['index'].get(normalized)
+    if normalized in lookup['ambiguous'] and normalized not in lookup['warned']:
+        lookup['warned'].add(normalized)
+        labels = ', '.join(m._meta.label for m in lookup['ambiguous'][normalized])
+        warnings.warn(
+            f"microsys: model name '{model_name}' is ambiguous ({labels}); "
+            f"using {model._meta.label}. Pass app_label to pick another one.",
+            RuntimeWarning,
+        )
+    return model
 
 
 def get_class_from_string(class_path):
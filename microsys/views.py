@@ -39,9 +39,9 @@ from crispy_forms.layout import Submit
 
 from .signals import get_client_ip
 from .tables import UserTable
-from .forms import CustomUserCreationForm, CustomUserChangeForm, CustomPasswordChangeForm, ResetPasswordForm, UserProfileEditForm
+from .forms import CustomUserCreationForm, CustomUserChangeForm, CustomPasswordChangeForm, ResetPasswordForm, UserProfileEditForm, SubsectionChoiceField
 from .filters import UserFilter
-from .utils import is_scope_enabled, discover_section_models, resolve_model_by_name, resolve_form_class_for_model, has_related_records, collect_related_objects, _get_request_translations
+from .utils import is_scope_enabled, discover_section_models, SectionCounts, resolve_model_by_name, resolve_form_class_for_model, has_related_records, locked_related_ids, collect_related_objects, get_relation_plan, subsection_search_q, _get_request_translations
 from .translations import get_strings
 
 User = get_user_model() # Use custom user model
@@ -769,6 +769,7 @@ def core_models_view(request):
     
     # Build map for easy lookup
     models_map = {sm['model_name']: sm for sm in section_models}
+    section_counts = SectionCounts(section_models)
     
     # Get model from query param or session fallback
     default_model = section_models[0]['model_name'] if section_models else None
@@ -799,7 +800,7 @@ def core_models_view(request):
         return render(request, 'microsys/sections/manage_sections.html', {
             'error': 'هناك خطأ في تحميل المودل.',
             'active_model': model_param,
-            'models': [{'name': sm['model_name'], 'ar_names': sm['verbose_name_plural'], 'count': sm['model'].objects.count()} for sm in section_models],
+            'models': [{'name': sm['model_name'], 'ar_names': sm['verbose_name_plural'], 'count': section_counts.lazy(sm['model_name'])} for sm in section_models],
         })
     
     # Check for edit mode
@@ -890,52 +891,48 @@ def core_models_view(request):
         related_field = sub['related_field']
         child_model = sub['model']
 
-        if related_field not in form.fields:
-            # Use the normal manager which applies scope filtering when enabled
-            form.fields[related_field] = forms.ModelMultipleChoiceField(
-                queryset=child_model.objects.all(),
-                required=False,
-                label=sub['verbose_name_plural'],
-                widget=forms.CheckboxSelectMultiple(),
-            )
-        else:
-            # Field exists - ensure it has the right queryset and widget
-            form.fields[related_field].queryset = child_model.objects.all()
-            form.fields[related_field].widget = forms.CheckboxSelectMultiple()
-        
-        # Sync widget choices with the field's queryset so CheckboxSelectMultiple renders correctly
-        form.fields[related_field].widget.choices = form.fields[related_field].choices
-
+        # Use the normal manager which applies scope filtering when enabled;
+        # rows are loaded once and shared by validation and rendering
+        existing = form.fields.get(related_field)
+        form.fields[related_field] = SubsectionChoiceField(
+            queryset=child_model.objects.all(),
+            required=existing.required if existing else False,
+            label=existing.label if existing else sub['verbose_name_plural'],
+            help_text=existing.help_text if existing else '',
+        )
         form.fields[related_field].modal_target = f"addSubsectionModal_{child_model_name}"
 
+        child_pks = []
         if instance:
             try:
                 rel_manager = getattr(instance, related_field, None)
                 if rel_manager is not None:
-                    form.fields[related_field].initial = list(
-                        rel_manager.values_list('pk', flat=True)
-                    )
+                    child_pks = list(rel_manager.values_list('pk', flat=True))
+                    form.fields[related_field].initial = child_pks
             except Exception:
                 pass
 
+        # Large child tables only render the first rows plus the selected ones
+        if form.is_bound:
+            form.fields[related_field].selected = form.data.getlist(form.add_prefix(related_field))
+        else:
+            form.fields[related_field].selected = child_pks
+
         # Determine which subsection items are "locked" (have dependencies elsewhere)
         locked_ids = []
-        if instance:
+        if child_pks:
             try:
-                rel_manager = getattr(instance, related_field, None)
-                if rel_manager is not None:
-                    # Get the reverse accessor name so we can ignore the parent→child M2M itself
+                # Get the reverse accessor name so we can ignore the parent→child M2M itself
+                accessor = None
+                try:
+                    field_obj = selected_model._meta.get_field(related_field)
+                    accessor = field_obj.remote_field.get_accessor_name()
+                except Exception:
                     accessor = None
-                    try:
-                        field_obj = selected_model._meta.get_field(related_field)
-                        accessor = field_obj.remote_field.get_accessor_name()
-                    except Exception:
-                        accessor = None
 
-                    ignore = [accessor] if accessor else []
-                    for child in rel_manager.all():
-                        if has_related_records(child, ignore_relations=ignore):
-                            locked_ids.append(str(child.pk))
+                ignore = [accessor] if accessor else []
+                locked = locked_related_ids(child_model, child_pks, ignore_relations=ignore)
+                locked_ids = [str(pk) for pk in child_pks if pk in locked]
             except Exception:
                 locked_ids = []
 
@@ -947,6 +944,7 @@ def core_models_view(request):
             'parent_field': related_field,
             'child_model': child_model_name,
             'add_url': reverse('add_subsection'),
+            'search_url': reverse('subsection_choices'),
             'edit_url_template': reverse('edit_subsection', args=[0]).replace('/0/', '/{id}/'),
             'delete_url_template': reverse('delete_subsection', args=[0]).replace('/0/', '/{id}/'),
         })
@@ -1091,7 +1089,7 @@ def core_models_view(request):
             {
                 'name': sm['model_name'], 
                 'ar_names': sm['verbose_name_plural'],
-                'count': sm['model'].objects.count()
+                'count': section_counts.lazy(sm['model_name'])  # Only evaluated for the tab that shows it
             } 
             for sm in section_models
         ],
@@ -1218,6 +1216,48 @@ def add_subsection(request):
     return redirect(redirect_url)
 
 
+SUBSECTION_SEARCH_PAGE_SIZE = 50
+
+
+@login_required
+def subsection_choices(request):
+    """
+    Search the rows of a subsection (child model) via AJAX, for child tables
+    too large to render as checkboxes.
+    Expects ?model=child_model_name&q=term&page=n
+    Returns JSON: {'results': [{'id', 'text'}], 'has_more'}
+    """
+    child_model_name = request.GET.get('model')
+    children = {
+        sub['model_name']: sub['model']
+        for sm in discover_section_models(app_name=None, include_children=False)
+        for sub in sm.get('subsections', [])
+    }
+    model = children.get(child_model_name)
+    if not model:
+        return JsonResponse({'success': False, 'error': 'القسم الفرعي غير موجود'}, status=404)
+
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    queryset = model.objects.all()
+    term = request.GET.get('q', '').strip()
+    if term:
+        queryset = queryset.filter(subsection_search_q(model, term))
+    if not queryset.ordered:
+        queryset = queryset.order_by('pk')
+
+    start = (page - 1) * SUBSECTION_SEARCH_PAGE_SIZE
+    rows = list(queryset[start:start + SUBSECTION_SEARCH_PAGE_SIZE + 1])
+    return JsonResponse({
+        'success': True,
+        'results': [{'id': obj.pk, 'text': str(obj)} for obj in rows[:SUBSECTION_SEARCH_PAGE_SIZE]],
+        'has_more': len(rows) > SUBSECTION_SEARCH_PAGE_SIZE,
+    })
+
+
 @login_required
 def edit_subsection(request, pk):
     """
@@ -1327,7 +1367,7 @@ def delete_section(request):
     
     # Check if has related records (protect from deletion)
     # Use generic helper to find WHAT is related
-    related_objects = collect_related_objects(instance)
+    related_objects = collect_related_objects(instance, preview=True)
     
     if related_objects:
         return JsonResponse({
@@ -1380,19 +1420,19 @@ def get_section_details(request):
     fields_data = {}
     exclude_fields = ['id', 'created_at', 'updated_at', 'scope', 'polymorphic_ctype', 'password']
     
-    for field in model._meta.fields:
+    for field, display_method in get_relation_plan(model)['detail_fields']:
         if field.name not in exclude_fields:
             try:
                 val = getattr(instance, field.name)
                 # Handle choices
-                if hasattr(instance, f"get_{field.name}_display"):
-                     val = getattr(instance, f"get_{field.name}_display")()
+                if display_method:
+                     val = getattr(instance, display_method)()
                 fields_data[field.verbose_name] = str(val) if val is not None else ""
             except:
                 pass
 
     # 2. Collect Related Objects
-    related_objects = collect_related_objects(instance)
+    related_objects = collect_related_objects(instance, preview=True)
     
     return JsonResponse({
         'success': True,